@@ -1,87 +1,215 @@
 import os
+from collections import OrderedDict
 
 import pygame
 
+from scenes.animation import Animation
+
 
 class AssetManager:
     """
-    Utility to manage game assets.
+    Utility to manage game assets. Loaded assets are kept in a cache that tracks how much memory each one uses. If a
+    memory budget is set, the least recently used assets are evicted once the budget is exceeded and they are reloaded
+    from their source file the next time they are requested. Pinned assets and assets registered from elsewhere (which
+    have no source file) are never evicted and don't count against the budget.
     """
 
-    def __init__(self, resource_dir="resources"):
+    def __init__(self, resource_dir="resources", memory_budget=None):
+        """
+        :param resource_dir: directory from which asset files are loaded
+        :param memory_budget: max number of bytes for evictable assets or None for no limit
+        """
         self.dir = resource_dir
-        self.resources = {}
+        self.memory_budget = memory_budget
+        # bytes used by all loaded assets, and by the ones that can be evicted (what the budget applies to)
+        self.memory_used = 0
+        self.evictable_used = 0
+        # loaded assets, ordered from least to most recently used
+        self.resources = OrderedDict()
+        self.loaders = {}
+        self.sizes = {}
+        self.pinned = set()
 
     def get(self, key):
         """
-        Gets a resource by key. If the key doesn't exist, this will raise a KeyError.
+        Gets a resource by key, reloading it if it was evicted. If the key doesn't exist, this will raise a KeyError.
         :param key:
         :return:
         """
-        return self.resources[key]
+        if key in self.resources:
+            self.resources.move_to_end(key)
+            return self.resources[key]
+        if key not in self.loaders:
+            raise KeyError(key)
+        return self._store(key, self.loaders[key]())
 
-    def load_sound(self, key, file_name, vol=1.0):
+    def load_sound(self, key, file_name, vol=1.0, pinned=False):
         """
         Loads a sound file and sets the volume.
         :param key:
         :param file_name:
         :param vol:
+        :param pinned: if True, the sound will never be evicted
         :return:
         """
-        self.resources[key] = pygame.mixer.Sound(os.path.join(self.dir, file_name))
-        self.resources[key].set_volume(vol)
 
-    def load_image(self, key, file_name, color_key=None):
+        def loader():
+            sound = pygame.mixer.Sound(os.path.join(self.dir, file_name))
+            sound.set_volume(vol)
+            return sound
+
+        self._add(key, loader, pinned)
+
+    def load_image(self, key, file_name, color_key=None, pinned=False):
         """
         Loads an image and sets the alpha color key if specified.
         :param key:
         :param file_name:
         :param color_key:
+        :param pinned: if True, the image will never be evicted
         :return:
         """
-        try:
-            self.resources[key] = pygame.image.load(os.path.join(self.dir, file_name))
-            if color_key is not None:
-                if color_key is -1:
-                    color_key = self.resources[key].get_at((0, 0))
-                self.resources[key].set_colorkey(color_key, pygame.RLEACCEL)
-                self.resources[key] = self.resources[key].convert_alpha()
-            else:
-                self.resources[key] = self.resources[key].convert()
-        except pygame.error:
-            print("Unable to load image {img} ".format(img=file_name))
-            raise SystemExit
-
-    def load_sprite_sheet(self, key, file_name):
+
+        def loader():
+            try:
+                image = pygame.image.load(os.path.join(self.dir, file_name))
+                if color_key is not None:
+                    key_value = color_key
+                    if key_value == -1:
+                        key_value = image.get_at((0, 0))
+                    image.set_colorkey(key_value, pygame.RLEACCEL)
+                    return convert(image, True)
+                else:
+                    return convert(image)
+            except pygame.error:
+                print("Unable to load image {img} ".format(img=file_name))
+                raise SystemExit
+
+        self._add(key, loader, pinned)
+
+    def load_sprite_sheet(self, key, file_name, pinned=False):
         """
         Loads an image as a SpriteSheet
         :param key:
         :param file_name:
+        :param pinned: if True, the sprite sheet will never be evicted
         :return:
         """
-        try:
-            self.resources[key] = SpriteSheet(pygame.image.load(os.path.join(self.dir, file_name)).convert_alpha())
-        except pygame.error:
-            print("Unable to load image {img} as sprite sheet".format(img=file_name))
-            raise SystemExit
+
+        def loader():
+            try:
+                return SpriteSheet(convert(pygame.image.load(os.path.join(self.dir, file_name)), True))
+            except pygame.error:
+                print("Unable to load image {img} as sprite sheet".format(img=file_name))
+                raise SystemExit
+
+        self._add(key, loader, pinned)
 
     def register_resource(self, key, value):
         """
-        Registers a resource created elsewhere with this asset manager.
+        Registers a resource created elsewhere with this asset manager. Since it can't be reloaded, it is pinned.
         :param key:
         :param value:
         :return:
         """
-        self.resources[key] = value
+        self.unload_resource(key)
+        self.pinned.add(key)
+        self._store(key, value)
 
     def unload_resource(self, key):
         """
-        Removes a resource from the internal map.
+        Removes a resource from the cache. Unlike eviction, the resource is forgotten and can't be reloaded.
+        :param key:
+        :return:
+        """
+        self._evict(key)
+        self.loaders.pop(key, None)
+        self.pinned.discard(key)
+
+    def pin(self, key):
+        """
+        Prevents a resource from being evicted.
+        :param key:
+        :return:
+        """
+        if key not in self.pinned and key in self.resources:
+            self.evictable_used -= self.sizes[key]
+        self.pinned.add(key)
+
+    def unpin(self, key):
+        """
+        Allows a resource to be evicted again. Registered resources can't be unpinned since they can't be reloaded.
+        :param key:
+        :return:
+        """
+        if key in self.loaders and key in self.pinned:
+            self.pinned.discard(key)
+            if key in self.resources:
+                self.evictable_used += self.sizes[key]
+            self._enforce_budget()
+
+    def _add(self, key, loader, pinned):
+        """
+        Loads a resource and remembers how to load it again.
+        :param key:
+        :param loader: function that returns the loaded resource
+        :param pinned:
+        :return:
+        """
+        self.unload_resource(key)
+        self.loaders[key] = loader
+        if pinned:
+            self.pinned.add(key)
+        self._store(key, loader())
+
+    def _store(self, key, value):
+        """
+        Adds a loaded resource to the cache as the most recently used entry and evicts others if we are over budget.
+        :param key:
+        :param value:
+        :return: the value
+        """
+        self.resources[key] = value
+        self.sizes[key] = size_of(value)
+        self.memory_used += self.sizes[key]
+        if key not in self.pinned:
+            self.evictable_used += self.sizes[key]
+        self._enforce_budget(key)
+        return value
+
+    def _evict(self, key):
+        """
+        Drops a resource from the cache, keeping its loader so it can be reloaded.
         :param key:
         :return:
         """
         if key in self.resources:
             del self.resources[key]
+            size = self.sizes.pop(key)
+            self.memory_used -= size
+            if key not in self.pinned:
+                self.evictable_used -= size
+
+    def _enforce_budget(self, keep=None):
+        """
+        Evicts least recently used resources until the memory used by evictable resources is within the budget.
+        :param keep: key that should not be evicted (the one just loaded)
+        :return:
+        """
+        if self.memory_budget is None or self.evictable_used <= self.memory_budget:
+            return
+        for key in [k for k in self.resources if k != keep and k not in self.pinned]:
+            self._evict(key)
+            if self.evictable_used <= self.memory_budget:
+                return
+
+    def __contains__(self, item):
+        """
+        Returns True if a resource with the key has been loaded or registered (even if it has since been evicted).
+        :param item:
+        :return:
+        """
+        return item in self.resources or item in self.loaders
 
     def __getitem__(self, item):
         """
@@ -89,7 +217,44 @@ class AssetManager:
         :param item:
         :return:
         """
-        return self.resources[item]
+        return self.get(item)
+
+
+def convert(image, alpha=False):
+    """
+    Converts an image to the pixel format of the display so it blits quickly. When there is no display surface (the
+    texture backend draws through a Renderer instead) the image is returned as is.
+    :param image:
+    :param alpha: if True, keep per pixel alpha
+    :return:
+    """
+    if pygame.display.get_surface() is None:
+        return image
+    if alpha:
+        return image.convert_alpha()
+    return image.convert()
+
+
+def size_of(value):
+    """
+    Estimates the number of bytes used by a resource. Surfaces count their pixel data, animations the pixel data of
+    their frames and sounds their PCM samples. Anything else counts as 0.
+    :param value:
+    :return:
+    """
+    if isinstance(value, Animation):
+        return sum(size_of(frame) for frame in value.frames)
+    if isinstance(value, SpriteSheet):
+        value = value.sheet
+    if isinstance(value, pygame.Surface):
+        return value.get_pitch() * value.get_height()
+    if isinstance(value, pygame.mixer.Sound):
+        mixer_info = pygame.mixer.get_init()
+        if mixer_info is None:
+            return 0
+        freq, fmt, channels = mixer_info
+        return int(value.get_length() * freq) * channels * ((abs(fmt) & 0xff) // 8)
+    return 0
 
 
 class SpriteSheet:
@@ -108,7 +273,7 @@ class SpriteSheet:
         :return:
         """
         rect = pygame.Rect(rectangle)
-        image = pygame.Surface(rect.size).convert()
+        image = convert(pygame.Surface(rect.size))
         image.blit(self.sheet, (0, 0), rect)
         if color_key is not None:
             if color_key is -1:
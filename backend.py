@@ -0,0 +1,157 @@
+import weakref
+
+import pygame
+
+from assetmanager import SpriteSheet
+from config import configvalues
+from scenes.animation import Animation
+
+
+def create_backend(name, size, software=False):
+    """
+    Creates the render backend.
+    :param name: 'surface' (the default) or 'texture'
+    :param size: window size
+    :param software: for the texture backend, use SDL's software renderer instead of the GPU
+    :return:
+    """
+    if name == 'surface':
+        return SurfaceBackend(size)
+    elif name == 'texture':
+        return TextureBackend(size, software)
+    print("Unknown render backend {b}".format(b=name))
+    raise SystemExit
+
+
+class SurfaceBackend:
+    """
+    Draws by blitting onto the display surface and updating the dirty rectangles. Scenes are handed the display
+    surface itself as their canvas so this adds no overhead.
+    """
+
+    name = 'surface'
+
+    def __init__(self, size):
+        self.canvas = pygame.display.set_mode(size, 0, 32)
+
+    def upload(self, assets):
+        """
+        Nothing to prepare for this backend.
+        :param assets:
+        :return:
+        """
+        pass
+
+    def present(self, rects):
+        """
+        Updates the display.
+        :param rects: what the scene's render returned - None for the whole screen, a Rect or a list of Rects
+        :return:
+        """
+        if rects is not None:
+            pygame.display.update(rects)
+        else:
+            pygame.display.update()
+
+    def close(self):
+        pass
+
+
+class TextureBackend:
+    """
+    Draws through an SDL2 Renderer (pygame._sdl2.video). Every surface is uploaded to a Texture the first time it is
+    drawn and the texture is reused as long as the surface is alive. This object is also the canvas passed to scenes,
+    so it implements the parts of the Surface API the scenes draw with: fill, blit and get_size.
+
+    Since renderers redraw the whole frame on present, scenes must repaint everything they want shown whenever they
+    render (all of them do).
+    """
+
+    name = 'texture'
+
+    def __init__(self, size, software=False):
+        """
+        Opens the window and creates the renderer.
+        :param size:
+        :param software: if True, use SDL's software renderer so no GPU is needed
+        """
+        from pygame._sdl2 import video
+        self.video = video
+        self.size = size
+        self.window = video.Window(configvalues.CAPTION, size)
+        self.renderer = video.Renderer(self.window, accelerated=0 if software else -1)
+        self.textures = weakref.WeakKeyDictionary()
+        self.canvas = self
+
+    def upload(self, assets):
+        """
+        Uploads every image, sprite sheet frame and animation frame held by the asset manager so the first frames
+        don't stall on texture creation.
+        :param assets:
+        :return:
+        """
+        for value in list(assets.resources.values()):
+            if isinstance(value, pygame.Surface):
+                self.texture(value)
+            elif isinstance(value, Animation):
+                for frame in value.frames:
+                    self.texture(frame)
+            elif isinstance(value, SpriteSheet):
+                self.texture(value.sheet)
+
+    def texture(self, surface):
+        """
+        Returns the texture for a surface, creating it on first use.
+        :param surface:
+        :return:
+        """
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = self.video.Texture.from_surface(self.renderer, surface)
+            self.textures[surface] = texture
+        return texture
+
+    def get_size(self):
+        return self.size
+
+    def fill(self, color, rect=None):
+        """
+        Fills the whole canvas (or just rect) with a color.
+        :param color:
+        :param rect:
+        :return:
+        """
+        self.renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(rect)
+
+    def blit(self, source, dest, area=None):
+        """
+        Draws a surface at dest (an x, y position or a Rect).
+        :param source:
+        :param dest:
+        :param area: optional part of the source to draw
+        :return:
+        """
+        if area is None:
+            w, h = source.get_size()
+        else:
+            area = pygame.Rect(area)
+            w, h = area.size
+        self.texture(source).draw(srcrect=area, dstrect=(dest[0], dest[1], w, h))
+
+    def present(self, rects):
+        """
+        Shows the frame. The renderer always presents the whole window so the rectangles are ignored.
+        :param rects:
+        :return:
+        """
+        self.renderer.present()
+
+    def close(self):
+        self.textures.clear()
+        # the window is already gone if pygame has been shut down
+        if pygame.get_init():
+            self.window.destroy()
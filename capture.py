@@ -0,0 +1,119 @@
+import queue
+import struct
+import threading
+import zlib
+
+import pygame
+
+MAGIC = b'MWCAP1'
+# magic, width, height, bits per pixel, bytes per pixel, r/g/b/a masks
+HEADER = struct.Struct('<6sHHBB4I')
+# frame number, ticks (ms), number of rects
+FRAME = struct.Struct('<IIH')
+# x, y, width, height, compressed length
+RECT = struct.Struct('<HHHHI')
+
+
+class FrameCapture:
+    """
+    Records the screen to a delta-frame file. Each frame only the dirty rectangles returned by the scene are read
+    straight out of the screen's pixel buffer and handed to a background thread, which compresses them and writes
+    them out. Use tools/capture_to_png.py to turn the file into images.
+    """
+
+    def __init__(self, file_name, screen, max_pending=64):
+        """
+        Opens the file, writes the header and starts the writer thread.
+        :param file_name:
+        :param screen: the display surface
+        :param max_pending: frames that may wait for the writer before capture blocks
+        """
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.frame = 0
+        self.file = open(file_name, 'wb')
+        self.file.write(HEADER.pack(MAGIC, self.screen_rect.width, self.screen_rect.height, screen.get_bitsize(),
+                                    screen.get_bytesize(), *screen.get_masks()))
+        self.pending = queue.Queue(max_pending)
+        self.writer = threading.Thread(target=self._write, name='frame-capture', daemon=True)
+        self.writer.start()
+
+    def capture(self, rects):
+        """
+        Copies the pixels inside the dirty rectangles and queues them for the writer.
+        :param rects: what the scene's render returned - None for the whole screen, a Rect or a list of Rects
+        :return:
+        """
+        if rects is None:
+            rects = [self.screen_rect]
+        elif isinstance(rects, pygame.Rect):
+            rects = [rects]
+        pitch = self.screen.get_pitch()
+        bpp = self.screen.get_bytesize()
+        regions = []
+        raw = memoryview(self.screen.get_buffer())
+        try:
+            for rect in rects:
+                if rect is None:
+                    continue
+                rect = self.screen_rect.clip(rect)
+                if rect.width == 0 or rect.height == 0:
+                    continue
+                start = rect.y * pitch + rect.x * bpp
+                row_len = rect.width * bpp
+                pixels = b''.join([raw[row:row + row_len] for row in range(start, start + rect.height * pitch, pitch)])
+                regions.append((rect.x, rect.y, rect.width, rect.height, pixels))
+        finally:
+            # the screen stays locked while the buffer is referenced
+            raw.release()
+        self.pending.put((self.frame, pygame.time.get_ticks(), regions))
+        self.frame += 1
+
+    def close(self):
+        """
+        Waits for queued frames to be written and closes the file.
+        :return:
+        """
+        self.pending.put(None)
+        self.writer.join()
+        self.file.close()
+
+    def _write(self):
+        """
+        Body of the writer thread.
+        :return:
+        """
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            frame, ticks, regions = item
+            self.file.write(FRAME.pack(frame, ticks, len(regions)))
+            for x, y, w, h, pixels in regions:
+                data = zlib.compress(pixels, 1)
+                self.file.write(RECT.pack(x, y, w, h, len(data)))
+                self.file.write(data)
+
+
+def read_capture(file_name):
+    """
+    Reads a file written by FrameCapture. Yields the header first and then one (frame, ticks, regions) tuple per frame,
+    where regions is a list of (x, y, width, height, pixels).
+    :param file_name:
+    :return:
+    """
+    with open(file_name, 'rb') as f:
+        header = HEADER.unpack(f.read(HEADER.size))
+        if header[0] != MAGIC:
+            raise ValueError("{f} is not a capture file".format(f=file_name))
+        yield header[1:]
+        while True:
+            data = f.read(FRAME.size)
+            if len(data) < FRAME.size:
+                return
+            frame, ticks, count = FRAME.unpack(data)
+            regions = []
+            for i in range(count):
+                x, y, w, h, length = RECT.unpack(f.read(RECT.size))
+                regions.append((x, y, w, h, zlib.decompress(f.read(length))))
+            yield frame, ticks, regions
@@ -0,0 +1,10 @@
+from collections import namedtuple
+
+from config import configvalues
+
+# Game balance settings. Each GameScene takes its own instance, so balance can be tuned per game (the sweep runner in
+# tools/sweep.py simulates many of them side by side). The defaults are the values in configvalues.
+Balance = namedtuple('Balance', ['max_step', 'max_delay', 'incorrect_answer_ratio', 'zap_width', 'max_concurrent',
+                                 'score_per_level'],
+                     defaults=(configvalues.MAX_STEP, configvalues.MAX_DELAY, configvalues.INCORRECT_ANSWER_RATIO,
+                               configvalues.ZAP_WIDTH, configvalues.MAX_CONCURRENT, configvalues.SCORE_PER_LEVEL))
@@ -2,8 +2,14 @@
 WIDTH = 1500
 # screen height
 HEIGHT = 1000
-# max frames per second
+# frames per second that per-frame speeds and counts are tuned for (and the starting frame rate)
 FPS = 25
+# window title
+CAPTION = 'Math Wizard'
+# how frames are drawn: 'surface' blits onto the display surface, 'texture' draws through an SDL2 Renderer
+RENDER_BACKEND = 'surface'
+# use SDL's software renderer for the texture backend (no GPU needed)
+SOFTWARE_RENDERER = False
 
 # directory for game resources
 RESOURCE_DIR = "resources"
@@ -36,3 +42,34 @@ WIN_DELAY = FPS
 # number of 'positions' wide a zap is
 ZAP_WIDTH = 4
 INCORRECT_ANSWER_RATIO = 3
+# number of equations the background spawn queue keeps ready for the current target
+SPAWN_QUEUE_SIZE = MAX_CONCURRENT * 2
+# max number of bytes of evictable image and sound data the asset manager keeps loaded (None for no limit). Pinned
+# and registered assets are always kept and don't count against it
+ASSET_MEMORY_BUDGET = None
+# max milliseconds the main loop sleeps waiting for input while the active scene is idle
+IDLE_WAIT = 500
+# freeze objects after loading and only run full garbage collections between scenes and levels
+GC_POLICY = True
+# milliseconds each frame of the sprite animations is displayed
+ANIMATION_FRAME_MS = 3 * 1000 // FPS
+# SQLite database student progress is saved to when a student name is given
+PROGRESS_DB = 'progress.db'
+# frames the stress test runs at each load level before deciding whether the machine keeps up
+STRESS_STAGE_FRAMES = FPS * 3
+# equations the stress test adds at each load level
+STRESS_EQUATION_STEP = 5
+# load level at which the stress test stops even if the machine is still keeping up
+STRESS_MAX_STAGES = 100
+# let the frame rate adapt to the machine between MIN_FPS and MAX_FPS. Game speeds are tuned for FPS and scaled to
+# whatever rate is in use
+ADAPTIVE_FPS = True
+MIN_FPS = 15
+MAX_FPS = 60
+# frames the frame rate governor averages before changing the rate
+GOVERNOR_WINDOW = FPS * 2
+# most frames' worth of movement applied in one frame, so a stall doesn't make everything jump
+MAX_FRAME_SCALE = 4
+# most reservations the lane scheduler takes out looking for a lane that frees up soon, bounding the cost of a spawn
+# when the screen is crowded
+LANE_SEARCH_LIMIT = 32
@@ -0,0 +1,33 @@
+import gc
+
+from config import configvalues
+
+# generation 2 threshold that automatic collection will never reach during a game
+NEVER = 2 ** 30
+
+
+def freeze_after_load():
+    """
+    Collects once all assets have been loaded and moves everything that survived into the permanent generation so
+    later collections don't have to scan it again. Automatic full collections are then switched off and only run from
+    collect_at_transition, when the screen isn't moving.
+
+    This means cyclic garbage in the oldest generation is only freed at those transitions: a single very long level
+    (or a stress run, which collects at the end of each stage instead) holds on to it until then.
+    :return:
+    """
+    if not configvalues.GC_POLICY:
+        return
+    gc.collect()
+    gc.freeze()
+    threshold0, threshold1, threshold2 = gc.get_threshold()
+    gc.set_threshold(threshold0, threshold1, NEVER)
+
+
+def collect_at_transition():
+    """
+    Runs a full collection. Call this when switching scenes or levels, where a pause won't be noticed.
+    :return:
+    """
+    if configvalues.GC_POLICY:
+        gc.collect()
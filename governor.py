@@ -0,0 +1,70 @@
+import collections
+
+from config import configvalues
+
+# the rate is lowered once frames use more than this fraction of their budget on average...
+LOWER_AT = 0.9
+# ...and raised once they use less than this fraction
+RAISE_AT = 0.5
+# fraction of the budget a new rate is picked to use
+TARGET_LOAD = 0.7
+
+
+class FrameRateGovernor:
+    """
+    Picks the frame rate from how long recent frames took to process and draw (clock.get_rawtime(), which leaves out
+    the time tick() spent waiting). Slow machines get a lower rate so they stop dropping behind, fast ones a higher rate
+    for smoother motion, always within MIN_FPS - MAX_FPS. Scenes scale their per-frame movement by the real time each
+    frame took (see GameClock.scale), so the game plays at the same speed at any rate.
+
+    Every change is printed with the frame times that caused it so the bounds can be tuned per device class.
+    """
+
+    def __init__(self, fps=configvalues.FPS, min_fps=configvalues.MIN_FPS, max_fps=configvalues.MAX_FPS,
+                 window=configvalues.GOVERNOR_WINDOW):
+        """
+        :param fps: starting rate
+        :param min_fps:
+        :param max_fps:
+        :param window: number of frames averaged before the rate is changed
+        """
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.fps = max(min_fps, min(fps, max_fps))
+        self.frame_times = collections.deque(maxlen=window)
+        print("frame rate {f} FPS (adapting between {lo} and {hi})".format(f=self.fps, lo=min_fps, hi=max_fps))
+
+    def record(self, raw_ms):
+        """
+        Adds the time a frame took. Once a full window has been recorded the rate is changed if the frames are using
+        too much or too little of their budget.
+        :param raw_ms: milliseconds the frame took, not counting the wait for the next frame
+        :return: True if the rate changed
+        """
+        self.frame_times.append(raw_ms)
+        if len(self.frame_times) < self.frame_times.maxlen:
+            return False
+        average = sum(self.frame_times) / len(self.frame_times)
+        budget = 1000 / self.fps
+        # the rate that would put frames at TARGET_LOAD of their budget
+        fitted = int(1000 * TARGET_LOAD / average) if average > 0 else self.max_fps
+        if average > budget * LOWER_AT and self.fps > self.min_fps:
+            self.change(max(self.min_fps, min(fitted, self.fps - 1)), "frames average {a:.1f} ms, over {p:.0%} of the "
+                        "{b:.1f} ms budget".format(a=average, p=LOWER_AT, b=budget))
+            return True
+        if average < budget * RAISE_AT and self.fps < self.max_fps:
+            self.change(min(self.max_fps, max(fitted, self.fps + 1)), "frames average {a:.1f} ms, under {p:.0%} of the "
+                        "{b:.1f} ms budget".format(a=average, p=RAISE_AT, b=budget))
+            return True
+        return False
+
+    def change(self, fps, reason):
+        """
+        Switches to a new rate and starts a new window so the next decision is based on frames at that rate.
+        :param fps:
+        :param reason: logged with the change
+        :return:
+        """
+        print("frame rate {o} -> {n} FPS: {r}".format(o=self.fps, n=fps, r=reason))
+        self.fps = fps
+        self.frame_times.clear()
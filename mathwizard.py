@@ -1,8 +1,17 @@
+import argparse
+
 import pygame
 from pygame.locals import *
 
 from assetmanager import AssetManager
+from backend import create_backend
+from capture import FrameCapture
 from config import configvalues
+import gcpolicy
+from governor import FrameRateGovernor
+from profiling import AllocationProfiler
+from progress import ProgressStore
+from scenes.stress import StressScene
 from scenes.title import TitleScene
 
 
@@ -12,7 +21,9 @@ def init():
     :return:
     """
     pygame.init()
-    pygame.display.set_mode((configvalues.WIDTH, configvalues.HEIGHT), 0, 32)
+    # the texture backend opens its own window in run_game; images are then left in their loaded format
+    if configvalues.RENDER_BACKEND == 'surface':
+        pygame.display.set_mode((configvalues.WIDTH, configvalues.HEIGHT), 0, 32)
 
     pygame.time.set_timer(USEREVENT + 1, 1000)
 
@@ -23,9 +34,11 @@ def init():
         joystick = pygame.joystick.Joystick(i)
         joystick.init()
 
-    pygame.display.set_caption('Math Wizard')
+    pygame.display.set_caption(configvalues.CAPTION)
 
-    return load_resources()
+    assets = load_resources()
+    gcpolicy.freeze_after_load()
+    return assets
 
 
 def load_resources():
@@ -33,7 +46,7 @@ def load_resources():
     Loads all resources and returns an AssetManager instance that can be used by scenes to access resources.
     :return:
     """
-    mgr = AssetManager(configvalues.RESOURCE_DIR)
+    mgr = AssetManager(configvalues.RESOURCE_DIR, configvalues.ASSET_MEMORY_BUDGET)
     # load fonts
     mgr.register_resource('targetfont', pygame.font.SysFont("monospace", 75, True))
     mgr.register_resource('eqfont', pygame.font.SysFont("monospace", 25, True))
@@ -60,26 +73,50 @@ def load_resources():
     return mgr
 
 
-def run_game(assets, starting_scene):
+def run_game(assets, starting_scene, frame_hook=None, capture_file=None, profiler=None, progress=None):
     """
     Runs the main loop for the game. On each frame, it will filter the set of events received since the last frame and
     then call the following on the active scene in order: process_events, update, render.
 
     :param assets:
     :param starting_scene:
+    :param frame_hook: optional function called with the active scene at the start of every frame, before events are
+    read. Scripted players use it to post input events.
+    :param capture_file: if set, the session is recorded to this file (see capture.FrameCapture)
+    :param profiler: optional AllocationProfiler that is fed every frame
+    :param progress: optional ProgressStore passed to the title scenes created when a game is quit
     :return:
     """
     clock = pygame.time.Clock()
     active_scene = starting_scene
-    screen = pygame.display.set_mode((configvalues.WIDTH, configvalues.HEIGHT), 0, 32)
+    # each scene references the one that replaced it through its next field, so holding on to the starting scene
+    # would keep every scene ever created alive
+    del starting_scene
+    backend = create_backend(configvalues.RENDER_BACKEND, (configvalues.WIDTH, configvalues.HEIGHT),
+                             configvalues.SOFTWARE_RENDERER)
+    backend.upload(assets)
+    filtered_events = []
+    governor = FrameRateGovernor() if configvalues.ADAPTIVE_FPS else None
+    capture = None
+    if capture_file is not None:
+        if backend.name != 'surface':
+            print("Capture is only supported with the surface render backend")
+            raise SystemExit
+        capture = FrameCapture(capture_file, backend.canvas)
 
     while active_scene is not None:
+        if profiler is not None:
+            profiler.frame_start()
+        if frame_hook is not None:
+            frame_hook(active_scene)
         pressed_keys = pygame.key.get_pressed()
+        # an idle scene waits for input instead of running at the frame rate
+        waiting = active_scene.is_idle() and not active_scene.dirty
 
         # Event filtering
-        filtered_events = []
+        filtered_events.clear()
         has_quit = False
-        for event in pygame.event.get():
+        for event in read_events(waiting):
             quit_attempt = False
             if event.type == pygame.QUIT:
                 quit_attempt = True
@@ -94,28 +131,111 @@ def run_game(assets, starting_scene):
                 if active_scene.get_name() == 'title':
                     has_quit = active_scene.terminate()
                 else:
-                    active_scene.switch_to_scene(TitleScene(assets))
+                    active_scene.switch_to_scene(TitleScene(assets, progress))
             else:
                 filtered_events.append(event)
 
         if not has_quit:
-            active_scene = process_frame(active_scene, filtered_events, pressed_keys, screen)
-            clock.tick(configvalues.FPS)
+            next_scene, rendered = process_frame(active_scene, filtered_events, pressed_keys, backend, capture,
+                                                 profiler)
+            changed = next_scene is not active_scene
+            if changed:
+                active_scene.cleanup()
+                # break the chain of scenes so a reference to an old scene (like the caller's starting scene) doesn't
+                # keep every scene created after it alive
+                active_scene.next = None
+                gcpolicy.collect_at_transition()
+            active_scene = next_scene
+            if governor is None:
+                clock.tick(configvalues.FPS)
+            else:
+                clock.tick(governor.fps)
+                # only frames that were drawn say how fast frames are: frames with nothing to draw take a fraction
+                # of a millisecond, and waiting for input or building the next scene aren't part of a frame at all
+                if rendered and not waiting and not changed:
+                    governor.record(clock.get_rawtime())
         else:
+            active_scene.cleanup()
             active_scene = None
+    if capture is not None:
+        capture.close()
+    backend.close()
 
 
-def process_frame(active_scene, filtered_events, pressed_keys, screen):
+def read_events(wait):
+    """
+    Returns the events received since the last frame. If wait is set (the scene is idle and has nothing to draw), this
+    blocks until an event arrives or IDLE_WAIT milliseconds pass so an idle screen doesn't keep the CPU busy.
+    :param wait:
+    :return:
+    """
+    if wait:
+        event = pygame.event.wait(configvalues.IDLE_WAIT)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    return pygame.event.get()
+
+
+def process_frame(active_scene, filtered_events, pressed_keys, backend, capture=None, profiler=None):
+    """
+    Runs one frame of the active scene: input, update and, if anything changed, render.
+    :param active_scene:
+    :param filtered_events:
+    :param pressed_keys:
+    :param backend: render backend the frame is drawn with
+    :param capture: optional FrameCapture the drawn frame is recorded to
+    :param profiler: optional AllocationProfiler
+    :return: tuple of (scene for the next frame, True if the frame was drawn)
+    """
+    rendered = False
     active_scene.process_input(filtered_events, pressed_keys)
     active_scene.update()
-    rects = active_scene.render(screen)
-    if rects is not None:
-        pygame.display.update(rects)
-    else:
-        pygame.display.update()
-    return active_scene.next
+    if active_scene.dirty:
+        active_scene.dirty = False
+        rects = active_scene.render(backend.canvas)
+        if capture is not None:
+            capture.capture(rects)
+        backend.present(rects)
+        rendered = True
+    if profiler is not None:
+        profiler.frame_end()
+    return active_scene.next, rendered
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Math Wizard')
+    parser.add_argument('--capture', metavar='FILE', help='record the session to FILE')
+    parser.add_argument('--profile-alloc', action='store_true',
+                        help='trace allocations and garbage collections and print a report on exit')
+    parser.add_argument('--backend', choices=['surface', 'texture'], default=configvalues.RENDER_BACKEND,
+                        help='render backend to draw with')
+    parser.add_argument('--software-renderer', action='store_true',
+                        help="use SDL's software renderer with the texture backend")
+    parser.add_argument('--stress', action='store_true',
+                        help='run the stress test instead of the game and print the max load this machine sustains')
+    parser.add_argument('--fixed-fps', action='store_true',
+                        help='always run at FPS instead of adapting the frame rate to the machine')
+    parser.add_argument('--student', help='save progress under this name')
+    parser.add_argument('--progress-db', metavar='FILE', default=configvalues.PROGRESS_DB,
+                        help='database the progress is saved to')
+    args = parser.parse_args()
+    configvalues.RENDER_BACKEND = args.backend
+    configvalues.SOFTWARE_RENDERER = configvalues.SOFTWARE_RENDERER or args.software_renderer
+    # the stress test measures against the fixed FPS budget
+    configvalues.ADAPTIVE_FPS = configvalues.ADAPTIVE_FPS and not args.fixed_fps and not args.stress
+    alloc_profiler = None
+    if args.profile_alloc:
+        alloc_profiler = AllocationProfiler()
+        alloc_profiler.start()
+    progress_store = None
+    if args.student:
+        progress_store = ProgressStore(args.progress_db, args.student)
     game_assets = init()
-    run_game(game_assets, TitleScene(game_assets))
+    run_game(game_assets, StressScene(game_assets) if args.stress else TitleScene(game_assets, progress_store),
+             capture_file=args.capture, profiler=alloc_profiler, progress=progress_store)
+    if progress_store is not None:
+        progress_store.close()
+    if alloc_profiler is not None:
+        alloc_profiler.stop()
+        print(alloc_profiler.report())
@@ -0,0 +1,111 @@
+import gc
+import os
+import time
+import tracemalloc
+
+
+class AllocationProfiler:
+    """
+    Profiles memory allocation in the main loop. For each frame it records:
+    - the peak number of bytes allocated on top of what was live when the frame started (short lived objects included)
+    - the blocks allocated during the frame that are still alive after rendering, by source line
+    It also times every garbage collection through gc.callbacks. Tracing slows the game down considerably, so this is
+    only meant for profiling runs.
+    """
+
+    def __init__(self, source_dir=None, top=15):
+        """
+        :param source_dir: only allocations made by files in this directory are reported (defaults to the game's)
+        :param top: number of source lines to include in the report
+        """
+        if source_dir is None:
+            source_dir = os.path.dirname(os.path.abspath(__file__))
+        self.filters = [tracemalloc.Filter(True, os.path.join(source_dir, '*')),
+                        tracemalloc.Filter(False, __file__)]
+        self.top = top
+        self.frames = 0
+        self.peak_total = 0
+        self.peak_max = 0
+        self.by_line = {}
+        self.gc_pauses = {}
+        self.gc_start = None
+        self.start_snapshot = None
+        self.start_memory = 0
+
+    def start(self):
+        """
+        Starts tracing allocations and timing collections.
+        :return:
+        """
+        tracemalloc.start()
+        gc.callbacks.append(self._on_gc)
+
+    def stop(self):
+        """
+        Stops tracing.
+        :return:
+        """
+        gc.callbacks.remove(self._on_gc)
+        tracemalloc.stop()
+
+    def frame_start(self):
+        """
+        Call at the start of a frame.
+        :return:
+        """
+        self.start_snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        tracemalloc.reset_peak()
+        self.start_memory = tracemalloc.get_traced_memory()[0]
+
+    def frame_end(self):
+        """
+        Call after the frame has been rendered, while the rectangles returned by render are still referenced.
+        :return:
+        """
+        peak = tracemalloc.get_traced_memory()[1] - self.start_memory
+        self.frames += 1
+        self.peak_total += peak
+        self.peak_max = max(self.peak_max, peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.filters)
+        for stat in snapshot.compare_to(self.start_snapshot, 'lineno'):
+            if stat.count_diff > 0:
+                frame = stat.traceback[0]
+                key = (frame.filename, frame.lineno)
+                count, size = self.by_line.get(key, (0, 0))
+                self.by_line[key] = (count + stat.count_diff, size + stat.size_diff)
+
+    def _on_gc(self, phase, info):
+        """
+        gc callback that times each collection.
+        :param phase: 'start' or 'stop'
+        :param info: dict holding the generation being collected
+        :return:
+        """
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            pauses = self.gc_pauses.setdefault(info['generation'], [])
+            pauses.append(time.perf_counter() - self.gc_start)
+            self.gc_start = None
+
+    def report(self):
+        """
+        Returns a printable summary of the profile.
+        :return:
+        """
+        if self.frames == 0:
+            return "no frames profiled"
+        lines = ["allocation profile over {n} frames".format(n=self.frames),
+                 "peak bytes allocated per frame: avg {a:.0f} max {m}".format(a=self.peak_total / self.frames,
+                                                                                m=self.peak_max),
+                 "blocks still alive after render, per frame:"]
+        ranked = sorted(self.by_line.items(), key=lambda item: item[1][0], reverse=True)
+        for (file_name, line), (count, size) in ranked[:self.top]:
+            lines.append("  {c:8.2f} blocks {s:10.1f} B  {f}:{l}".format(
+                c=count / self.frames, s=size / self.frames, f=os.path.relpath(file_name), l=line))
+        lines.append("gc pauses:")
+        for generation in sorted(self.gc_pauses):
+            pauses = self.gc_pauses[generation]
+            lines.append("  gen {g}: {n} collections, total {t:.2f} ms, max {m:.2f} ms".format(
+                g=generation, n=len(pauses), t=sum(pauses) * 1000, m=max(pauses) * 1000))
+        return "\n".join(lines)
@@ -0,0 +1,263 @@
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    score INTEGER
+);
+CREATE INDEX IF NOT EXISTS sessions_student ON sessions(student_id, started_at);
+CREATE TABLE IF NOT EXISTS levels (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    level INTEGER NOT NULL,
+    target INTEGER NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL NOT NULL,
+    score INTEGER NOT NULL,
+    completed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS levels_session ON levels(session_id);
+-- one row per equation the student answered: zapped, or let a correct one reach the floor
+CREATE TABLE IF NOT EXISTS fact_results (
+    level_id INTEGER NOT NULL REFERENCES levels(id),
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    fact TEXT NOT NULL,
+    target INTEGER NOT NULL,
+    zapped INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    at REAL NOT NULL
+);
+-- covers per-fact queries over a time range without touching the table
+CREATE INDEX IF NOT EXISTS fact_results_student_fact ON fact_results(student_id, fact, at, correct);
+CREATE INDEX IF NOT EXISTS fact_results_level ON fact_results(level_id);
+-- running totals per student and fact, kept up to date as levels are written so all-time accuracy is a single
+-- index range read however much history there is
+CREATE TABLE IF NOT EXISTS fact_stats (
+    student_id INTEGER NOT NULL REFERENCES students(id),
+    fact TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    last_at REAL NOT NULL,
+    PRIMARY KEY (student_id, fact)
+) WITHOUT ROWID;
+"""
+
+
+def open_db(file_name):
+    """
+    Opens the progress database, creating the tables if needed. The database runs in WAL mode so reports can be read
+    while a game is writing.
+    :param file_name:
+    :return: sqlite3 Connection
+    """
+    conn = sqlite3.connect(file_name)
+    conn.execute('PRAGMA journal_mode=WAL')
+    # in WAL mode NORMAL only syncs at checkpoints and can't corrupt the database
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA foreign_keys=ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def fact_accuracy(conn, student, since=None, min_attempts=1):
+    """
+    Returns how often a student answered each fact correctly, weakest facts first.
+    :param conn: connection from open_db
+    :param student: student name
+    :param since: if set, only count results from this unix time on; otherwise all of the student's history is used
+    :param min_attempts: leave out facts answered fewer times than this
+    :return: list of (fact, attempts, correct, accuracy)
+    """
+    if since is None:
+        rows = conn.execute(
+            'SELECT fs.fact, fs.attempts, fs.correct FROM fact_stats fs JOIN students s ON s.id = fs.student_id '
+            'WHERE s.name = ? AND fs.attempts >= ?', (student, min_attempts))
+    else:
+        rows = conn.execute(
+            'SELECT fr.fact, COUNT(*), SUM(fr.correct) FROM fact_results fr JOIN students s ON s.id = fr.student_id '
+            'WHERE s.name = ? AND fr.at >= ? GROUP BY fr.fact HAVING COUNT(*) >= ?', (student, since, min_attempts))
+    results = [(fact, attempts, correct, correct / attempts) for fact, attempts, correct in rows]
+    results.sort(key=lambda r: (r[3], -r[1]))
+    return results
+
+
+class ProgressStore:
+    """
+    Saves a student's progress to an SQLite database. All database work happens on a background thread: games only
+    hand it completed batches through a queue, so the game loop never waits on the disk. Each batch (a level or the end
+    of a session) is written in a single transaction.
+    """
+
+    def __init__(self, file_name, student):
+        """
+        Starts the writer thread, which opens (and if needed creates) the database.
+        :param file_name:
+        :param student: name the progress is saved under
+        """
+        self.file_name = file_name
+        self.student = student
+        self.pending = queue.Queue()
+        self._session_ids = itertools.count(1)
+        self.writer = threading.Thread(target=self._write, name='progress-store', daemon=True)
+        self.writer.start()
+
+    def start_session(self):
+        """
+        Starts recording a new game.
+        :return: ProgressSession
+        """
+        session = ProgressSession(self, next(self._session_ids))
+        self.pending.put(('session', session.key, time.time()))
+        return session
+
+    def close(self):
+        """
+        Waits for everything queued to be written and closes the database.
+        :return:
+        """
+        self.pending.put(None)
+        self.writer.join()
+
+    def _write(self):
+        """
+        Body of the writer thread.
+        :return:
+        """
+        try:
+            conn = open_db(self.file_name)
+        except sqlite3.Error as e:
+            print("Unable to open progress database {f}: {e}".format(f=self.file_name, e=e))
+            # keep draining the queue so close() doesn't hang
+            while self.pending.get() is not None:
+                pass
+            return
+        student_id = None
+        # maps ProgressSession keys to rows in the sessions table
+        session_rows = {}
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            # a failed batch is logged and dropped; the thread carries on so later batches are still saved
+            try:
+                if student_id is None:
+                    student_id = self._student_id(conn)
+                if item[0] == 'session':
+                    key, started_at = item[1:]
+                    with conn:
+                        session_rows[key] = conn.execute(
+                            'INSERT INTO sessions (student_id, started_at) VALUES (?, ?)',
+                            (student_id, started_at)).lastrowid
+                elif item[1] not in session_rows:
+                    print("Skipping progress for session {k}, which couldn't be saved".format(k=item[1]))
+                elif item[0] == 'level':
+                    with conn:
+                        self._write_level(conn, student_id, session_rows[item[1]], *item[2:])
+                elif item[0] == 'end':
+                    key, ended_at, score = item[1:]
+                    with conn:
+                        conn.execute('UPDATE sessions SET ended_at = ?, score = ? WHERE id = ?',
+                                     (ended_at, score, session_rows.pop(key)))
+            except Exception as e:
+                print("Unable to save progress: {e}".format(e=e))
+        conn.close()
+
+    def _student_id(self, conn):
+        """
+        Looks up the student's row, adding it if needed.
+        :param conn:
+        :return:
+        """
+        with conn:
+            conn.execute('INSERT OR IGNORE INTO students (name) VALUES (?)', (self.student,))
+        return conn.execute('SELECT id FROM students WHERE name = ?', (self.student,)).fetchone()[0]
+
+    @staticmethod
+    def _write_level(conn, student_id, session_id, level, target, started_at, ended_at, score, completed, results):
+        """
+        Writes a level, its fact results and the updated fact totals.
+        :return:
+        """
+        level_id = conn.execute(
+            'INSERT INTO levels (session_id, level, target, started_at, ended_at, score, completed) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (session_id, level, target, started_at, ended_at, score, completed)).lastrowid
+        conn.executemany(
+            'INSERT INTO fact_results (level_id, student_id, fact, target, zapped, correct, at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(level_id, student_id, fact, target, zapped, correct, at) for fact, zapped, correct, at in results])
+        conn.executemany(
+            'INSERT INTO fact_stats (student_id, fact, attempts, correct, last_at) VALUES (?, ?, 1, ?, ?) '
+            'ON CONFLICT (student_id, fact) DO UPDATE SET attempts = attempts + 1, '
+            'correct = correct + excluded.correct, last_at = excluded.last_at',
+            [(student_id, fact, correct, at) for fact, zapped, correct, at in results])
+
+
+class ProgressSession:
+    """
+    Collects the results of one game in memory. Nothing is written until a level ends, when the whole level is queued
+    for the store's writer thread as one batch.
+    """
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+        self.level = None
+        self.results = []
+
+    def start_level(self, level, target):
+        """
+        Starts collecting results for a level.
+        :param level: level number
+        :param target: target value of the level
+        :return:
+        """
+        self.level = (level, target, time.time())
+        self.results = []
+
+    def record(self, fact, zapped, correct):
+        """
+        Records the student's answer to an equation.
+        :param fact: the equation text
+        :param zapped: True if the equation was zapped, False if it reached the floor
+        :param correct: True if that was the right thing to do
+        :return:
+        """
+        if self.level is not None:
+            self.results.append((fact, int(zapped), int(correct), time.time()))
+
+    def finish_level(self, score, completed=True):
+        """
+        Queues the current level to be written.
+        :param score: points scored in the level
+        :param completed: False if the level was abandoned
+        :return:
+        """
+        if self.level is None:
+            return
+        level, target, started_at = self.level
+        self.store.pending.put(('level', self.key, level, target, started_at, time.time(), score, int(completed),
+                                self.results))
+        self.level = None
+        self.results = []
+
+    def end(self, score, level_score=0):
+        """
+        Ends the session. A level still in progress is saved as not completed.
+        :param score: final score
+        :param level_score: points scored in the level in progress
+        :return:
+        """
+        self.finish_level(level_score, False)
+        self.store.pending.put(('end', self.key, time.time(), score))
@@ -0,0 +1,101 @@
+import collections
+
+import pygame
+
+from config import configvalues
+
+
+class Animation(collections.namedtuple('Animation', ['frames', 'frame_ms', 'loop', 'done_event'])):
+    """
+    Immutable definition of an animation that is shared by everything that plays it. Sprites only need to remember
+    when they started playing it; the frame to draw is worked out from the elapsed time so nothing has to be updated
+    per frame.
+
+    frames: tuple of surfaces
+    frame_ms: how long each frame is displayed
+    loop: if False, the animation stops on its last frame
+    done_event: optional pygame event type that is posted when a non-looping animation finishes
+    """
+
+    def __new__(cls, frames, frame_ms, loop=False, done_event=None):
+        return super().__new__(cls, tuple(frames), frame_ms, loop, done_event)
+
+    @property
+    def duration(self):
+        """
+        :return: milliseconds it takes to play every frame once
+        """
+        return len(self.frames) * self.frame_ms
+
+    def index_at(self, elapsed):
+        """
+        Returns the index of the frame to display after the animation has been playing for elapsed milliseconds.
+        :param elapsed:
+        :return:
+        """
+        idx = max(elapsed, 0) // self.frame_ms
+        if self.loop:
+            return idx % len(self.frames)
+        return min(idx, len(self.frames) - 1)
+
+    def frame_at(self, elapsed):
+        """
+        Returns the frame to display after the animation has been playing for elapsed milliseconds.
+        :param elapsed:
+        :return:
+        """
+        return self.frames[self.index_at(elapsed)]
+
+    def is_done(self, elapsed):
+        """
+        Returns True if a non-looping animation has played all its frames.
+        :param elapsed:
+        :return:
+        """
+        return not self.loop and elapsed >= self.duration
+
+    def post_done(self, **attributes):
+        """
+        Posts the done_event (if there is one).
+        :param attributes: attributes for the event
+        :return:
+        """
+        if self.done_event is not None:
+            pygame.event.post(pygame.event.Event(self.done_event, **attributes))
+
+
+class GameClock:
+    """
+    Milliseconds of game time. Animations are timed against this rather than the frame count so they play at the same
+    speed whatever the frame rate. The clock doesn't advance while the game is paused.
+
+    scale is how many frames at FPS the last frame lasted. Speeds and counts tuned per frame are multiplied by it so
+    they stay the same per second when the frame rate changes.
+    """
+
+    def __init__(self):
+        self.time = 0
+        self.scale = 1.0
+        self.last_ticks = pygame.time.get_ticks()
+
+    def update(self, running=True):
+        """
+        Advances the clock by the time since the last call, unless the game isn't running.
+        :param running:
+        :return:
+        """
+        now = pygame.time.get_ticks()
+        elapsed = now - self.last_ticks
+        self.scale = min(elapsed * configvalues.FPS / 1000, configvalues.MAX_FRAME_SCALE)
+        if running:
+            self.time += elapsed
+        self.last_ticks = now
+
+    def resume(self):
+        """
+        Starts timing from now, so the time the game spent stopped (paused or waiting for a key) isn't added to the
+        next update, which would make everything jump when play resumes.
+        :return:
+        """
+        self.last_ticks = pygame.time.get_ticks()
+        self.scale = 1.0
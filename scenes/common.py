@@ -5,6 +5,8 @@ class Scene:
     def __init__(self, resources):
         self.next = self
         self.resources = resources
+        # True when the scene has changed since it was last rendered
+        self.dirty = True
 
     def process_input(self, events, pressed_keys):
         """
@@ -24,15 +26,38 @@ class Scene:
 
     def render(self, screen):
         """
-        Draws the scene.
+        Draws the scene. This is only called when the scene is dirty.
         :param screen:
         :return: list of rectangles to update
         """
         return None
 
+    def invalidate(self):
+        """
+        Marks the scene as changed so it will be rendered on the next frame.
+        :return:
+        """
+        self.dirty = True
+
+    def is_idle(self):
+        """
+        Override to return True when the scene won't change until it receives an input event. While a scene is idle
+        and not dirty, the main loop sleeps until an event arrives instead of running frames at FPS.
+        :return:
+        """
+        return False
+
     def switch_to_scene(self, next_scene):
         self.next = next_scene
 
+    def cleanup(self):
+        """
+        Releases anything the scene holds once it has been replaced by another scene. Override if the scene owns
+        threads or other resources.
+        :return:
+        """
+        pass
+
     def get_name(self):
         """
         :return: the name of the scene
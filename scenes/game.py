@@ -3,9 +3,12 @@ import pygame
 import random
 
 from config import configvalues
+from config.balance import Balance
+import gcpolicy
+from scenes.animation import Animation, GameClock
 from scenes.common import Scene
-
-OPERATORS = ['+', '-']
+from scenes.lanes import LaneScheduler
+from scenes.spawn import SpawnQueue, build_payload
 
 
 class GameScene(Scene):
@@ -13,17 +16,24 @@ class GameScene(Scene):
     This class represents the main scene in the game.
     """
 
-    def __init__(self, resources):
+    def __init__(self, resources, balance=None, progress=None, clock=None):
         """
         Initialize the scene by starting the play music and initializing the state of the game (avatar, target value,
         score, and equations).
         :param resources:
+        :param balance: Balance settings for this game (defaults to the configured values)
+        :param progress: optional ProgressStore the game is recorded to
+        :param clock: clock the game is timed against (defaults to a GameClock following the wall clock)
         """
         Scene.__init__(self, resources)
+        self.balance = balance if balance is not None else Balance()
+        self.session = progress.start_session() if progress is not None else None
         pygame.mixer.music.load(os.path.join(configvalues.RESOURCE_DIR, 'gameMusic.ogg'))
         pygame.mixer.music.set_volume(0.2)
         pygame.mixer.music.play(-1)
-        self.avatar = Avatar(resources['sprites'])
+        load_animations(resources)
+        self.clock = clock if clock is not None else GameClock()
+        self.avatar = Avatar(resources, self.clock)
         self.first_draw = True
         self.paused = False
         self.won_level = False
@@ -31,11 +41,18 @@ class GameScene(Scene):
         self.wait_tick = 0
         self.target = TargetValue(resources['targetfont'])
         self.floor_tile_w, self.floor_tile_h = resources['floor'].get_rect().size
-        self.window_w, self.window_h = pygame.display.get_surface().get_size()
+        self.window_w, self.window_h = configvalues.WIDTH, configvalues.HEIGHT
         self.top_of_floor = self.window_h - self.floor_tile_h
+        # rectangles are reused between frames so rendering doesn't allocate new ones
+        self.floor_rect = pygame.Rect(0, self.top_of_floor - 100, self.window_w, self.top_of_floor)
+        self.dirty_recs = []
         self.score = Score(resources['scorefont'])
-        self.equations = [Equation(resources['eqfont'], resources['explosion']) for i in
-                          range(configvalues.MAX_CONCURRENT)]
+        # keep two payloads ready per equation, like SPAWN_QUEUE_SIZE does for the configured MAX_CONCURRENT
+        self.spawn_queue = SpawnQueue(resources['eqfont'], self.window_w, self.balance,
+                                      2 * self.balance.max_concurrent)
+        self.lanes = LaneScheduler(self.window_w, self.top_of_floor, self.balance)
+        self.equations = [Equation(resources['eqfont'], resources['explosion_anim'], self.clock, self.spawn_queue,
+                                   self.balance, self.lanes) for i in range(self.balance.max_concurrent)]
         self.level_score = 0
         self.movedir = 0
         self.joytick = 0
@@ -64,7 +81,7 @@ class GameScene(Scene):
             if (event.type == pygame.KEYDOWN and event.key == pygame.K_RIGHT) or (
                     event.type == pygame.JOYBUTTONDOWN and event.button == 61):
                 if self.paused:
-                    self.paused = False
+                    self.set_paused(False)
                 else:
                     if event.type == pygame.JOYBUTTONDOWN:
                         self.movedir = 1
@@ -73,28 +90,47 @@ class GameScene(Scene):
             elif (event.type == pygame.KEYDOWN and event.key == pygame.K_LEFT) or (
                     event.type == pygame.JOYBUTTONDOWN and event.button == 63):
                 if self.paused:
-                    self.paused = False
+                    self.set_paused(False)
                 else:
                     if event.type == pygame.JOYBUTTONDOWN:
                         self.movedir = -1
                     self.joytick = 0
                     self.avatar.move(-1)
             elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
-                self.paused = not self.paused
+                self.set_paused(not self.paused)
             elif (event.type == pygame.KEYDOWN and event.key == pygame.K_UP) or (
                     event.type == pygame.JOYBUTTONDOWN and event.button == 60):
                 if self.paused:
-                    self.paused = False
+                    self.set_paused(False)
                 else:
                     self.handle_jump()
             elif event.type == pygame.JOYBUTTONUP:
                 self.movedir = 0
                 self.joytick = 0
         if self.movedir != 0 and not self.paused:
-            self.joytick += 1
-            if self.joytick % configvalues.JOYSTICK_REPEAT == 0:
+            self.joytick += self.clock.scale
+            while self.joytick >= configvalues.JOYSTICK_REPEAT:
+                self.joytick -= configvalues.JOYSTICK_REPEAT
                 self.avatar.move(self.movedir)
 
+    def set_paused(self, paused):
+        """
+        Pauses or resumes the game.
+        :param paused:
+        :return:
+        """
+        if self.paused and not paused:
+            self.clock.resume()
+        self.paused = paused
+        self.invalidate()
+
+    def is_idle(self):
+        """
+        The scene is idle while paused and once the 'press any key' message is showing after a level.
+        :return:
+        """
+        return self.paused or (self.display_win and self.wait_tick <= 0)
+
     def handle_jump(self):
         """
         Makes the avatar jump and fire at an equation. This method will also play the 'zap' sound effect and check
@@ -105,10 +141,12 @@ class GameScene(Scene):
         self.resources['zap'].play()
         collided_eq = self.get_collision()
         if collided_eq is not None:
+            if self.session is not None:
+                self.session.record(collided_eq.payload.text, True, collided_eq.is_correct())
             if collided_eq.is_correct():
                 self.score.increment_score(1)
                 self.level_score += 1
-                if self.level_score >= configvalues.SCORE_PER_LEVEL:
+                if self.level_score >= self.balance.score_per_level:
                     self.won_level = True
                     self.wait_tick = configvalues.WIN_DELAY
                 self.resources['boom'].play()
@@ -124,16 +162,7 @@ class GameScene(Scene):
         the bottom of the screen will be returned.
         :return: Equation instance that was hit or None
         """
-        avatar_pos = self.avatar.get_pos_idx()
-        hit = None
-        for eq in self.equations:
-            if abs(eq.get_pos_idx() - avatar_pos) <= configvalues.ZAP_WIDTH and not eq.exploding:
-                if hit is not None:
-                    if eq.get_pos()[1] > hit.get_pos()[1]:
-                        hit = eq
-                else:
-                    hit = eq
-        return hit
+        return find_collision(self.equations, self.avatar.get_pos_idx(), self.balance.zap_width)
 
     def start_level(self):
         """
@@ -146,28 +175,59 @@ class GameScene(Scene):
         self.paused = False
         self.wait_tick = 0
         self.game_over = not self.target.next_target()
+        self.spawn_queue.set_target(self.target.get_value())
         for eq in self.equations:
             eq.reset(self.target.get_value(), self.window_w)
         self.level_score = 0
+        # the time spent on the level-done screen isn't played
+        self.clock.resume()
+        if self.session is not None and not self.game_over:
+            self.session.start_level(self.target.target_idx + 1, self.target.get_value())
+        self.invalidate()
+
+    def cleanup(self):
+        """
+        Stops the background thread that prepares equations and ends the progress session.
+        :return:
+        """
+        self.spawn_queue.stop()
+        if self.session is not None:
+            self.session.end(self.score.score, self.level_score)
 
     def update(self):
         """
         Updates the state of the scene as long as it is not paused.
         :return:
         """
-        if not self.paused and not self.game_over and not self.display_win:
+        running = not self.paused and not self.game_over and not self.display_win
+        self.clock.update(running)
+        if running:
+            self.lanes.tick(self.clock.scale)
             self.avatar.update()
             for eq in self.equations:
                 should_reset = eq.update(self.top_of_floor)
                 if should_reset:
+                    # a correct equation that made it to the floor counts as a wrong answer
+                    if self.session is not None and not eq.exploding and eq.is_correct():
+                        self.session.record(eq.payload.text, False, False)
                     eq.reset(self.target.get_value(), self.window_w)
+            self.invalidate()
         if self.won_level or self.game_over:
-            self.wait_tick -= 1
+            was_waiting = self.wait_tick > 0
+            self.wait_tick -= self.clock.scale
             if not self.display_win and self.wait_tick <= 0:
                 pygame.mixer.music.pause()
                 self.resources['fanfare'].play()
                 self.wait_tick = configvalues.WON_MSG_TICKS
                 self.display_win = True
+                # zaps during WIN_DELAY still count, so the level is saved once play has stopped
+                if self.session is not None:
+                    self.session.finish_level(self.level_score)
+                self.invalidate()
+                gcpolicy.collect_at_transition()
+            elif self.display_win and was_waiting and self.wait_tick <= 0:
+                # time to replace the win message with 'press any key'
+                self.invalidate()
 
     def render(self, screen):
         """
@@ -189,13 +249,17 @@ class GameScene(Scene):
             else:
                 dirty_recs = self.render_centered(screen, self.window_w, self.window_h, self.resources['anykey'])
         else:
-            # now render the components and get their rectangles that need to be painted
-            dirty_recs = [pygame.Rect(0, self.top_of_floor - 100, self.window_w, self.top_of_floor),
-                          self.avatar.render(screen, self.window_w, self.top_of_floor),
-                          self.target.render(screen, self.window_w), self.score.render(screen)]
+            # now render the components and collect their rectangles that need to be painted. The avatar is always
+            # within the floor rectangle.
+            dirty_recs = self.dirty_recs
+            dirty_recs.clear()
+            dirty_recs.append(self.floor_rect)
+            self.avatar.render(screen, self.window_w, self.top_of_floor)
+            dirty_recs.append(self.target.render(screen, self.window_w))
+            dirty_recs.append(self.score.render(screen))
 
             for eq in self.equations:
-                dirty_recs += eq.render(screen)
+                eq.render(screen, dirty_recs)
 
         if self.first_draw:
             self.first_draw = False
@@ -204,104 +268,105 @@ class GameScene(Scene):
             return dirty_recs
 
 
+def find_collision(equations, avatar_pos, zap_width):
+    """
+    Finds the equation a zap from the avatar position hits. If more than 1 equation are hit, the one closest to the
+    bottom of the screen will be returned.
+    :param equations:
+    :param avatar_pos: position index of the avatar
+    :param zap_width: number of positions on either side of the avatar the zap reaches
+    :return: Equation instance that was hit or None
+    """
+    hit = None
+    for eq in equations:
+        if abs(eq.get_pos_idx() - avatar_pos) <= zap_width and not eq.exploding:
+            if hit is not None:
+                if eq.get_pos()[1] > hit.get_pos()[1]:
+                    hit = eq
+            else:
+                hit = eq
+    return hit
+
+
 class Equation:
     """
-    Data structure for an equation. It will load the images needed to render an explosion so equation instances should be
-    reused (by calling reset()) rather than constructed anew each time you want to display a new equation.
+    Data structure for an equation. Equation instances should be reused (by calling reset()) rather than constructed
+    anew each time you want to display a new equation.
     """
 
-    def __init__(self, font, sprite_sheet):
+    def __init__(self, font, explosion, clock, spawn_queue=None, balance=None, lanes=None):
+        """
+        :param font: font for the equation text or None when simulating without a display
+        :param explosion: Animation played when the equation is zapped
+        :param clock: GameClock the explosion is timed against
+        :param spawn_queue:
+        :param balance: Balance settings used when the equation is generated inline
+        :param lanes: optional LaneScheduler that picks a position clear of the other equations
+        """
         self.font = font
+        self.explosion = explosion
+        self.clock = clock
+        self.spawn_queue = spawn_queue
+        self.balance = balance
+        self.lanes = lanes
+        self.payload = None
         self.text = None
         self.correct = False
-        self.pos = (0, 0)
-        self.prev_pos = (0, 0)
+        # positions and rectangles are updated in place to avoid allocating new ones every frame
+        self.pos = [0, 0]
+        self.prev_pos = [0, 0]
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.prev_rect = pygame.Rect(0, 0, 0, 0)
+        self.text_w = 0
+        self.text_h = 0
         self.step = 1
-        self.animation_index = 0
-        self.ticks_per_image = 2
-        self.tick = 0
+        self.explode_start = 0
         self.exploding = False
         self.has_exploded = False
         self.old_text = None
         self.pos_idx = 0
         self.delay = 0
-        self.images = sprite_sheet.images_at([
-            (0, 250, 110, 120),
-            (0, 380, 110, 120),
-            (0, 510, 110, 120),
-            (0, 650, 110, 120),
-        ], (128, 128, 128))
 
     def reset(self, target_value, screen_width):
         """
-        Resets this instance by picking a new random delay (ticks before starting to fall) and starting location.
+        Resets this instance with the next prepared equation from the spawn queue. If the queue has run dry (or there
+        is no queue) the equation is generated inline instead. With a lane scheduler, the scheduler picks the position
+        and may push the start back until a lane is free.
         :param target_value:
         :param screen_width:
         :return:
         """
-        self.delay = random.randint(0, configvalues.MAX_DELAY)
-        self.animation_index = 0
-        self.ticks_per_image = 2
-        self.tick = 0
+        payload = None
+        if self.spawn_queue is not None:
+            payload = self.spawn_queue.pop()
+            if payload is None:
+                payload = self.spawn_queue.build(target_value)
+        else:
+            payload = build_payload(self.font, target_value, screen_width, self.balance)
         if self.exploding:
             self.has_exploded = True
             self.old_text = self.text
         self.exploding = False
-        cor = random.randint(1, 10)
-        if cor > configvalues.INCORRECT_ANSWER_RATIO:
-            self.correct = True
-        else:
-            self.correct = False
-        self.step = random.randint(1, configvalues.MAX_STEP)
-        self.text = self.generate_equation_text(target_value)
-        self.pos_idx = random.randint(1, configvalues.MAX_POS - 5)
-        x_pos = (screen_width // configvalues.MAX_POS) * self.pos_idx
-        self.pos = (x_pos, 0)
-
-    def generate_equation_text(self, target_value):
-        """
-        Returns a text instance populated with an equation that is randomly generated based on the target value. The
-        config value INCORRECT_ANS_RATIO drives how frequently incorrect equations will be generated.
-        :param target_value:
-        :return:
-        """
-        op = OPERATORS[random.randint(0, len(OPERATORS) - 1)]
-        if op == '+':
-            a = random.randint(0, target_value)
-        elif op == '-':
-            a = random.randint(0, configvalues.MAX_TARGET)
-        candidates = []
-        for i in range(configvalues.MAX_TARGET):
-            if self.correct:
-                if op == '+':
-                    if a + i == target_value:
-                        candidates.append(i)
-                elif op == '-':
-                    if a - i == target_value:
-                        candidates.append(i)
-            else:
-                if op == '+':
-                    if a + i != target_value:
-                        candidates.append(i)
-                elif op == '-':
-                    if a - i != target_value:
-                        candidates.append(i)
-        if len(candidates) == 0:
-            # we couldn't generate a correct equation. try again
-            # TODO: do this a more elegant way
-            return self.generate_equation_text(target_value)
-        else:
-            r = random.SystemRandom()
-            r.shuffle(candidates)
-            b = candidates[0]
-            return self.font.render("{a} {o} {b}".format(a=a, o=op, b=b), True, (255, 0, 0))
+        self.delay = payload.delay
+        self.correct = payload.correct
+        self.step = payload.step
+        self.payload = payload
+        self.text = payload.surface
+        if payload.surface is not None:
+            self.text_w, self.text_h = payload.surface.get_size()
+        self.pos_idx = payload.pos_idx
+        self.pos[0], self.pos[1] = payload.pos
+        if self.lanes is not None:
+            self.pos_idx, self.delay = self.lanes.place(self, self.text_w, self.text_h, self.step, self.delay)
+            self.pos[0] = (screen_width // configvalues.MAX_POS) * self.pos_idx
 
     def explode(self):
         """
-        Sets the exploding flag to True.
+        Sets the exploding flag to True and starts the explosion animation.
         :return:
         """
         self.exploding = True
+        self.explode_start = self.clock.time
 
     def update(self, top_of_floor):
         """
@@ -312,48 +377,46 @@ class Equation:
         """
         if self.delay <= 1 and not self.exploding:
             self.has_exploded = False
-            self.prev_pos = self.pos
-            self.pos = (self.pos[0], self.pos[1] + self.step)
+            self.prev_pos[0] = self.pos[0]
+            self.prev_pos[1] = self.pos[1]
+            self.pos[1] += self.step * self.clock.scale
             if self.pos[1] >= top_of_floor:
                 return True
         elif self.exploding:
-            self.prev_pos = self.pos
-            self.tick += 1
-            if self.tick > self.ticks_per_image:
-                self.tick = 0
-                self.animation_index += 1
-                if self.animation_index >= len(self.images):
-                    self.animation_index = 0
-                    return True
-
-        self.delay -= 1
+            self.prev_pos[0] = self.pos[0]
+            self.prev_pos[1] = self.pos[1]
+            if self.explosion.is_done(self.clock.time - self.explode_start):
+                self.explosion.post_done(equation=self)
+                return True
+
+        self.delay -= self.clock.scale
         return False
 
-    def render(self, screen):
+    def render(self, screen, dirty_recs):
         """
         Draws either the equation text or the explosion animation depending on the state of the exploding flag and
-        returns rectangles representing both the previous and current position.
+        appends rectangles representing both the previous and current position to dirty_recs.
         :param screen:
+        :param dirty_recs:
         :return:
         """
         if self.delay <= 0 and not self.exploding:
             screen.blit(self.text, self.pos)
-            return [pygame.Rect(self.pos[0], self.pos[1], self.text.get_width(),
-                                self.text.get_height()),
-                    pygame.Rect(self.prev_pos[0], self.prev_pos[1], self.text.get_width(),
-                                self.text.get_height())]
+            self.rect.update(self.pos[0], self.pos[1], self.text_w, self.text_h)
+            self.prev_rect.update(self.prev_pos[0], self.prev_pos[1], self.text_w, self.text_h)
+            dirty_recs.append(self.rect)
+            dirty_recs.append(self.prev_rect)
         elif self.exploding:
-            screen.blit(self.images[self.animation_index], (self.pos[0], self.pos[1]))
-            img_w, img_h = self.images[self.animation_index].get_rect().size
-            return [pygame.Rect(self.pos[0], self.pos[1], img_w, img_h),
-                    pygame.Rect(self.prev_pos[0], self.prev_pos[1], self.text.get_width(),
-                                self.text.get_height())]
+            image = self.explosion.frame_at(self.clock.time - self.explode_start)
+            screen.blit(image, self.pos)
+            self.rect.update(self.pos[0], self.pos[1], image.get_width(), image.get_height())
+            self.prev_rect.update(self.prev_pos[0], self.prev_pos[1], self.text_w, self.text_h)
+            dirty_recs.append(self.rect)
+            dirty_recs.append(self.prev_rect)
         elif self.has_exploded:
-            img_w, img_h = self.images[len(self.images) - 1].get_rect().size
-            return [pygame.Rect(self.prev_pos[0], self.prev_pos[1], img_w,
-                            img_h)]
-        else:
-            return []
+            image = self.explosion.frames[-1]
+            self.rect.update(self.prev_pos[0], self.prev_pos[1], image.get_width(), image.get_height())
+            dirty_recs.append(self.rect)
 
 
     def is_correct(self):
@@ -368,6 +431,47 @@ class Equation:
         return self.pos
 
 
+def load_animations(resources):
+    """
+    Builds the animations used by the game from the sprite sheets and registers them with the asset manager. They are
+    shared by every GameScene so this only does any work the first time it is called.
+    :param resources:
+    :return:
+    """
+    if 'explosion_anim' in resources:
+        return
+    frame_ms = configvalues.ANIMATION_FRAME_MS
+    explosion = resources['explosion'].images_at([
+        (0, 250, 110, 120),
+        (0, 380, 110, 120),
+        (0, 510, 110, 120),
+        (0, 650, 110, 120),
+    ], (128, 128, 128))
+    resources.register_resource('explosion_anim', Animation(explosion, frame_ms))
+
+    r_walk = resources['sprites'].images_at(
+        [(25, 100, 75, 75),
+         (105, 100, 75, 75),
+         (185, 100, 75, 75),
+         (265, 100, 75, 75), ],
+        (128, 128, 128)  # alpha color
+    )
+    r_jump = resources['sprites'].images_at(
+        [
+            (535, 220, 75, 100),
+            (615, 220, 75, 100),
+            (680, 220, 75, 100),
+            (755, 220, 75, 100),
+        ], (128, 128, 128)
+    )
+    # reverse for left images
+    resources.register_resource('walk_r', Animation(r_walk, frame_ms, loop=True))
+    resources.register_resource('walk_l', Animation([pygame.transform.flip(i, True, False) for i in r_walk], frame_ms,
+                                                    loop=True))
+    resources.register_resource('jump_r', Animation(r_jump, frame_ms))
+    resources.register_resource('jump_l', Animation([pygame.transform.flip(i, True, False) for i in r_jump], frame_ms))
+
+
 class TargetValue:
     """
     Represents the target value for which the player must find valid equations.
@@ -383,6 +487,7 @@ class TargetValue:
         self.text = None
         self.font = font
         self.target_idx = -1
+        self.rect = pygame.Rect(0, 0, 0, 0)
 
     def next_target(self):
         """
@@ -404,8 +509,9 @@ class TargetValue:
         """
         screen.blit(self.text,
                     ((width - self.text.get_width()) // 2, self.text.get_height() + 10))
-        return pygame.Rect(width - self.text.get_width(), self.text.get_height() + 20, self.text.get_width(),
-                           self.text.get_height())
+        self.rect.update(width - self.text.get_width(), self.text.get_height() + 20, self.text.get_width(),
+                         self.text.get_height())
+        return self.rect
 
     def get_value(self):
         """
@@ -420,41 +526,28 @@ class TargetValue:
 
 class Avatar:
     """
-    Represents the player's avatar. This sprite class loads the relevant images from the sprite sheet and will reverse
-    them to keep a copy facing both directions (so we don't have to do it in the render loop).
+    Represents the player's avatar. The walking and jumping animations (facing both directions) are built once by
+    load_animations, so the avatar only keeps track of when they started.
     """
 
-    def __init__(self, sprite_sheet):
+    def __init__(self, resources, clock):
         """
-        Loads images from the sprite sheet and sets initial position to the middle of the floor.
-        :param sprite_sheet:
+        Looks up the animations and sets initial position to the middle of the floor.
+        :param resources:
+        :param clock: GameClock the animations are timed against
         """
+        self.clock = clock
         self.pos = configvalues.MAX_POS // 2
-        self.animation_index = 0
-        self.ticks_per_image = 2
-        self.tick = 0
-        self.moving = False
         self.facing_r = True
         self.jumping = False
-        self.r_images = sprite_sheet.images_at(
-            [(25, 100, 75, 75),
-             (105, 100, 75, 75),
-             (185, 100, 75, 75),
-             (265, 100, 75, 75), ],
-            (128, 128, 128)  # alpha color
-        )
-        # reverse for left images
-        self.l_images = [pygame.transform.flip(i, True, False) for i in self.r_images]
-
-        self.r_jump = sprite_sheet.images_at(
-            [
-                (535, 220, 75, 100),
-                (615, 220, 75, 100),
-                (680, 220, 75, 100),
-                (755, 220, 75, 100),
-            ], (128, 128, 128)
-        )
-        self.l_jump = [pygame.transform.flip(i, True, False) for i in self.r_jump]
+        self.jump_start = 0
+        # the walk animation plays from walk_start until walk_end and then stays on the frame it reached
+        self.walk_start = 0
+        self.walk_end = 0
+        self.r_walk = resources['walk_r']
+        self.l_walk = resources['walk_l']
+        self.r_jump = resources['jump_r']
+        self.l_jump = resources['jump_l']
 
     def move(self, unit):
         """
@@ -471,52 +564,43 @@ class Avatar:
                 self.facing_r = True
                 if self.pos < configvalues.MAX_POS - 1:
                     self.pos += unit
-            self.moving = True
+            now = self.clock.time
+            if now > self.walk_end:
+                # resume the walk animation from the frame it stopped on
+                self.walk_start += now - self.walk_end
+            self.walk_end = now + self.r_walk.frame_ms
 
     def jump(self):
         """
-        Sets the jumping flag and animation index.
+        Sets the jumping flag and starts the jump animation.
         :return:
         """
         if not self.jumping:
-            self.moving = True
             self.jumping = True
-            self.animation_index = 0
+            self.jump_start = self.clock.time
 
     def update(self):
         """
-        Updates the animation index for the sprite if we moved.
+        Ends the jump once its animation has played.
         :return:
         """
-        if self.moving:
-            self.tick += 1
-            if self.tick > self.ticks_per_image:
-                self.tick = 0
-                self.animation_index += 1
-                if self.jumping:
-                    if self.animation_index >= len(self.r_jump):
-                        self.animation_index = 0
-                        self.jumping = False
-                else:
-                    self.moving = False
-                    if self.animation_index >= len(self.r_images):
-                        self.animation_index = 0
+        if self.jumping and self.r_jump.is_done(self.clock.time - self.jump_start):
+            self.jumping = False
+            self.r_jump.post_done(avatar=self)
+            self.walk_start = self.walk_end = self.clock.time
 
     def render(self, screen, screen_width, floor_height):
         """Draws the avatar and returns a rectangle the entire width of the screen."""
         # TODO: keep track of prior position so we can return a smaller rect
         x_pos = (screen_width // configvalues.MAX_POS) * self.pos
         # TODO: dynamically get sprite height?
-        if self.facing_r:
-            if self.jumping:
-                screen.blit(self.r_jump[self.animation_index], (x_pos, floor_height - 100))
-            else:
-                screen.blit(self.r_images[self.animation_index], (x_pos, floor_height - 75))
+        if self.jumping:
+            animation = self.r_jump if self.facing_r else self.l_jump
+            screen.blit(animation.frame_at(self.clock.time - self.jump_start), (x_pos, floor_height - 100))
         else:
-            if self.jumping:
-                screen.blit(self.l_jump[self.animation_index], (x_pos, floor_height - 100))
-            else:
-                screen.blit(self.l_images[self.animation_index], (x_pos, floor_height - 75))
+            animation = self.r_walk if self.facing_r else self.l_walk
+            elapsed = min(self.clock.time, self.walk_end) - self.walk_start
+            screen.blit(animation.frame_at(elapsed), (x_pos, floor_height - 75))
 
     def get_pos_idx(self):
         return self.pos
@@ -546,9 +630,8 @@ class Score:
         :return:
         """
         self.text = self.font.render("Score {v}".format(v=self.score), True, (255, 255, 0))
+        self.rect = pygame.Rect(10, 10, self.text.get_width(), self.text.get_height())
 
     def render(self, screen):
-        screen.blit(self.text,
-                    (10, 10))
-        return pygame.Rect(10, 10, self.text.get_width(),
-                           self.text.get_height())
+        screen.blit(self.text, self.rect)
+        return self.rect
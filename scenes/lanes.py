@@ -0,0 +1,223 @@
+import heapq
+import itertools
+import random
+
+from config import configvalues
+
+
+class SpanTree:
+    """
+    Segment tree over the horizontal positions that counts how many reserved spans cover each position and keeps the
+    longest run of uncovered positions for every node, so a free run of a given length can be found in O(log n).
+    Spans may overlap: a position is free once every span covering it has been removed.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.cover = [0] * (4 * size)
+        # longest free run starting at the left edge, ending at the right edge and anywhere in each node
+        self.prefix = [0] * (4 * size)
+        self.suffix = [0] * (4 * size)
+        self.best = [0] * (4 * size)
+        self._build(1, 0, size)
+
+    def _build(self, node, lo, hi):
+        self.prefix[node] = self.suffix[node] = self.best[node] = hi - lo
+        if hi - lo > 1:
+            mid = (lo + hi) // 2
+            self._build(2 * node, lo, mid)
+            self._build(2 * node + 1, mid, hi)
+
+    def add(self, start, end, count):
+        """
+        Adds count (1 to reserve, -1 to release) to the coverage of positions start up to (not including) end.
+        :param start:
+        :param end:
+        :param count:
+        :return:
+        """
+        start, end = max(start, 0), min(end, self.size)
+        if start < end:
+            self._add(1, 0, self.size, start, end, count)
+
+    def _add(self, node, lo, hi, start, end, count):
+        if start <= lo and hi <= end:
+            self.cover[node] += count
+        else:
+            mid = (lo + hi) // 2
+            if start < mid:
+                self._add(2 * node, lo, mid, start, end, count)
+            if end > mid:
+                self._add(2 * node + 1, mid, hi, start, end, count)
+        self._pull(node, lo, hi)
+
+    def _pull(self, node, lo, hi):
+        if self.cover[node] > 0:
+            self.prefix[node] = self.suffix[node] = self.best[node] = 0
+        elif hi - lo == 1:
+            self.prefix[node] = self.suffix[node] = self.best[node] = 1
+        else:
+            mid = (lo + hi) // 2
+            left, right = 2 * node, 2 * node + 1
+            self.prefix[node] = self.prefix[left] + (self.prefix[right] if self.prefix[left] == mid - lo else 0)
+            self.suffix[node] = self.suffix[right] + (self.suffix[left] if self.suffix[right] == hi - mid else 0)
+            self.best[node] = max(self.best[left], self.best[right], self.suffix[left] + self.prefix[right])
+
+    def find(self, length, start=0):
+        """
+        Finds the leftmost run of at least length free positions beginning at or after start.
+        :param length:
+        :param start:
+        :return: first position of the run or None
+        """
+        if length <= 0 or self.best[1] < length:
+            return None
+        return self._find(1, 0, self.size, length, start)
+
+    def _find(self, node, lo, hi, length, start):
+        if hi - max(lo, start) < length or self.best[node] < length:
+            return None
+        if self.cover[node] == 0 and hi - lo == self.best[node]:
+            # the whole node is free
+            return max(lo, start)
+        mid = (lo + hi) // 2
+        found = self._find(2 * node, lo, mid, length, start)
+        if found is not None:
+            return found
+        # a run crossing the middle
+        run_start = max(mid - self.suffix[2 * node], start)
+        if run_start < mid and mid - run_start + self.prefix[2 * node + 1] >= length:
+            return run_start
+        return self._find(2 * node + 1, mid, hi, length, start)
+
+
+class LaneScheduler:
+    """
+    Decides where new equations spawn so they don't overlap the ones already falling. Each equation reserves the
+    horizontal span it covers (its text width plus a ZAP_WIDTH margin) until it has fallen far enough that an equation
+    spawned above it can't reach it before the floor, even at the max speed. Reservations are kept in a SpanTree, so
+    finding a free lane doesn't scan the other equations, and in a heap ordered by when they expire.
+
+    If there is no free lane now, the spawn is delayed (never by more than MAX_DELAY frames) until the first lane that
+    frees up. If even that doesn't help (more equations than fit on the screen), the equation goes to a random position
+    as it did before.
+    """
+
+    def __init__(self, screen_width, floor_y, balance):
+        """
+        :param screen_width:
+        :param floor_y: y position where equations leave the screen
+        :param balance: Balance settings of the game
+        """
+        self.pos_w = screen_width // configvalues.MAX_POS
+        self.floor_y = floor_y
+        self.balance = balance
+        # equations start anywhere from position 1 up to the right edge
+        self.tree = SpanTree(configvalues.MAX_POS - 1)
+        self.frame = 0
+        self.reservations = {}
+        self.expiring = []
+        self._seq = itertools.count()
+
+    def tick(self, frames=1):
+        """
+        Advances the frame count and frees the spans whose equations have fallen clear.
+        :param frames: frames at FPS that have passed (see GameClock.scale)
+        :return:
+        """
+        self.frame += frames
+        while self.expiring and self.expiring[0][0] <= self.frame:
+            release, seq, owner, span = heapq.heappop(self.expiring)
+            if self.reservations.get(owner) is span:
+                del self.reservations[owner]
+                self.tree.add(span[0], span[1], -1)
+
+    def place(self, owner, width, height, step, delay):
+        """
+        Picks the position for an equation and reserves its span. Any span the owner still holds is released first.
+        :param owner: the equation
+        :param width: text width in pixels
+        :param height: text height in pixels
+        :param step: pixels the equation falls per frame
+        :param delay: frames until the equation starts falling
+        :return: (pos_idx, delay)
+        """
+        self.release(owner)
+        length = -(-width // self.pos_w) + self.balance.zap_width
+        start = self._find(length)
+        if start is None:
+            start, delay = self._find_later(length, delay)
+        if start is None:
+            start = random.randint(0, max(self.tree.size - length, 0))
+        span = (start, start + length)
+        self.tree.add(span[0], span[1], 1)
+        self.reservations[owner] = span
+        heapq.heappush(self.expiring, (self.frame + delay + self._clear_frames(height, step), next(self._seq), owner,
+                                       span))
+        return start + 1, delay
+
+    def release(self, owner):
+        """
+        Frees the span held by an equation (it was zapped or reached the floor).
+        :param owner:
+        :return:
+        """
+        span = self.reservations.pop(owner, None)
+        if span is not None:
+            self.tree.add(span[0], span[1], -1)
+
+    def _find(self, length):
+        """
+        Finds a free run, starting the search at a random position (wrapping around) so equations spread out.
+        :param length:
+        :return:
+        """
+        first = random.randint(0, max(self.tree.size - length, 0))
+        start = self.tree.find(length, first)
+        if start is None and first > 0:
+            start = self.tree.find(length)
+        return start
+
+    def _find_later(self, length, delay):
+        """
+        Looks for a lane that frees up within MAX_DELAY frames. Reservations are taken out of the tree in the order they
+        expire until a run fits, then put back - the new equation waits until the last one taken out has expired. At
+        most LANE_SEARCH_LIMIT reservations are taken out, so a spawn costs O(LANE_SEARCH_LIMIT * log n) however many
+        equations are falling (stale heap entries are dropped as they are met, which is paid for by the release that
+        made them stale).
+        :param length:
+        :param delay:
+        :return: (start or None, delay)
+        """
+        removed = []
+        start = None
+        while self.expiring and start is None and len(removed) < configvalues.LANE_SEARCH_LIMIT:
+            entry = heapq.heappop(self.expiring)
+            release, seq, owner, span = entry
+            if self.reservations.get(owner) is not span:
+                # stale entry for a span that was already released
+                continue
+            if release - self.frame > self.balance.max_delay:
+                heapq.heappush(self.expiring, entry)
+                break
+            removed.append(entry)
+            self.tree.add(span[0], span[1], -1)
+            start = self._find(length)
+            if start is not None:
+                delay = max(delay, release - self.frame)
+        for entry in removed:
+            self.tree.add(entry[3][0], entry[3][1], 1)
+            heapq.heappush(self.expiring, entry)
+        return start, delay
+
+    def _clear_frames(self, height, step):
+        """
+        Frames after an equation starts falling until its span can be reused: it must be a text height below the top
+        and far enough down that an equation falling at the max step can't catch it before the floor.
+        :param height:
+        :param step:
+        :return:
+        """
+        clear = height + self.balance.zap_width * self.pos_w
+        catch_up = self.floor_y / step - (self.floor_y - clear) / self.balance.max_step
+        return int(max(clear / step, catch_up)) + 1
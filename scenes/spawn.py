@@ -0,0 +1,164 @@
+import collections
+import random
+import threading
+
+from config import configvalues
+from config.balance import Balance
+
+OPERATORS = ['+', '-']
+
+# Fully prepared state for an equation that is ready to start falling.
+SpawnPayload = collections.namedtuple('SpawnPayload', ['target', 'text', 'surface', 'correct', 'step', 'delay',
+                                                       'pos_idx', 'pos'])
+
+
+def generate_equation_text(target_value, correct):
+    """
+    Returns a string holding an equation that is randomly generated based on the target value. If correct is True, the
+    equation will evaluate to the target value, otherwise it will evaluate to anything else.
+    :param target_value:
+    :param correct:
+    :return:
+    """
+    while True:
+        op = OPERATORS[random.randint(0, len(OPERATORS) - 1)]
+        if op == '+':
+            a = random.randint(0, target_value)
+        else:
+            a = random.randint(0, configvalues.MAX_TARGET)
+        candidates = []
+        for i in range(configvalues.MAX_TARGET):
+            if op == '+':
+                result = a + i
+            else:
+                result = a - i
+            if (result == target_value) == correct:
+                candidates.append(i)
+        # if we couldn't generate a suitable equation with this operand, try again
+        if len(candidates) > 0:
+            b = random.choice(candidates)
+            return "{a} {o} {b}".format(a=a, o=op, b=b)
+
+
+def build_payload(font, target_value, screen_width, balance=None):
+    """
+    Builds a SpawnPayload for the target value. This picks the correctness, speed, delay and starting location and
+    renders the equation text.
+    :param font: font to render the text with or None to skip rendering (for simulations)
+    :param target_value:
+    :param screen_width:
+    :param balance: Balance settings (defaults to the configured values)
+    :return:
+    """
+    if balance is None:
+        balance = Balance()
+    correct = random.randint(1, 10) > balance.incorrect_answer_ratio
+    step = random.randint(1, balance.max_step)
+    delay = random.randint(0, balance.max_delay)
+    text = generate_equation_text(target_value, correct)
+    surface = font.render(text, True, (255, 0, 0)) if font is not None else None
+    pos_idx = random.randint(1, configvalues.MAX_POS - 5)
+    pos = ((screen_width // configvalues.MAX_POS) * pos_idx, 0)
+    return SpawnPayload(target_value, text, surface, correct, step, delay, pos_idx, pos)
+
+
+class SpawnQueue:
+    """
+    Queue of equations that are ready to spawn for the current target. A background thread keeps the queue filled so
+    resetting an equation doesn't have to generate and render it in the middle of a frame.
+    """
+
+    def __init__(self, font, screen_width, balance=None, size=configvalues.SPAWN_QUEUE_SIZE):
+        """
+        Starts the background thread. It will sit idle until a target is set.
+        :param font:
+        :param screen_width:
+        :param balance: Balance settings for the payloads
+        :param size: number of payloads to keep ready
+        """
+        self.font = font
+        self.screen_width = screen_width
+        self.balance = balance
+        self.size = size
+        # fonts are not safe to render from 2 threads at once, so all rendering goes through this lock
+        self.render_lock = threading.Lock()
+        self._ready = collections.deque()
+        self._cond = threading.Condition()
+        self._target = None
+        self._generation = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._fill, name='spawn-queue', daemon=True)
+        self._thread.start()
+
+    def set_target(self, target_value):
+        """
+        Discards everything in the queue and starts building payloads for the new target value.
+        :param target_value:
+        :return:
+        """
+        with self._cond:
+            self._generation += 1
+            self._target = target_value
+            self._ready.clear()
+            self._cond.notify()
+
+    def resize(self, size):
+        """
+        Changes the number of payloads kept ready (for example when equations are added to the game).
+        :param size:
+        :return:
+        """
+        with self._cond:
+            self.size = size
+            self._cond.notify()
+
+    def pop(self):
+        """
+        Removes the next payload from the queue.
+        :return: SpawnPayload or None if the queue is empty
+        """
+        with self._cond:
+            if len(self._ready) == 0:
+                return None
+            payload = self._ready.popleft()
+            self._cond.notify()
+            return payload
+
+    def build(self, target_value):
+        """
+        Builds a payload on the calling thread. Used when the queue has run dry.
+        :param target_value:
+        :return:
+        """
+        with self.render_lock:
+            return build_payload(self.font, target_value, self.screen_width, self.balance)
+
+    def stop(self):
+        """
+        Stops the background thread.
+        :return:
+        """
+        with self._cond:
+            self._running = False
+            self._ready.clear()
+            self._cond.notify()
+        self._thread.join()
+
+    def _fill(self):
+        """
+        Body of the background thread. Waits until there is room in the queue then builds a payload for the current
+        target. Payloads built for a target that was replaced in the meantime are thrown away.
+        :return:
+        """
+        while True:
+            with self._cond:
+                while self._running and (self._target is None or len(self._ready) >= self.size):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                generation = self._generation
+                target_value = self._target
+            payload = self.build(target_value)
+            with self._cond:
+                if generation == self._generation:
+                    self._ready.append(payload)
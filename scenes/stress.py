@@ -0,0 +1,153 @@
+import random
+import time
+
+from config import configvalues
+from config.balance import Balance
+import gcpolicy
+from scenes.game import Equation, GameScene
+
+
+class StressScene(GameScene):
+    """
+    Stress test built on the game scene. The equations, avatar and explosions are the real ones, but nobody plays:
+    every STRESS_STAGE_FRAMES frames the load goes up a level - STRESS_EQUATION_STEP more equations, 2 more explosions
+    per second and one more avatar move per frame - until frames take longer than the FPS budget. The equation count,
+    frame time and dirty-rect area are shown while it runs, and the highest load level the machine kept up with is
+    printed at the end.
+    """
+
+    def __init__(self, resources):
+        # levels are never won, so the equations keep falling
+        GameScene.__init__(self, resources, Balance(max_concurrent=configvalues.STRESS_EQUATION_STEP,
+                                                    score_per_level=2 ** 30))
+        self.budget_ms = 1000 / configvalues.FPS
+        self.stage = 1
+        self.stage_frames = 0
+        self.stage_work = 0
+        self.stage_period = 0
+        self.frame_start = None
+        # False for a frame that shouldn't be counted (the one a garbage collection ran in)
+        self.measure = True
+        self.work_ms = 0
+        self.dirty_area = 0
+        self.explosion_credit = 0
+        self.move_dir = 1
+        self.sustained = None
+        # True if the test stopped at STRESS_MAX_STAGES while the machine was still keeping up
+        self.capped = False
+        self.readout_rect = None
+
+    def get_name(self):
+        return 'stress'
+
+    def process_input(self, events, pressed_keys):
+        """
+        Ignores the player. This is where each frame starts, so the time since the last frame is measured here.
+        :param events:
+        :param pressed_keys:
+        :return:
+        """
+        now = time.perf_counter()
+        if self.frame_start is not None and self.measure:
+            self.stage_period += (now - self.frame_start) * 1000
+            self.stage_work += self.work_ms
+            self.stage_frames += 1
+        self.frame_start = now
+        self.measure = True
+
+    def update(self):
+        """
+        Applies the current load (explosions and avatar moves), updates the game and moves on to the next load level
+        at the end of each stage.
+        :return:
+        """
+        self.explosion_credit += 2 * self.stage * self.clock.scale / configvalues.FPS
+        while self.explosion_credit >= 1:
+            self.explosion_credit -= 1
+            visible = [eq for eq in self.equations if eq.delay <= 0 and not eq.exploding]
+            if len(visible) > 0:
+                random.choice(visible).explode()
+        for i in range(self.stage):
+            pos = self.avatar.get_pos_idx()
+            if pos <= 0 or pos >= configvalues.MAX_POS - 1:
+                self.move_dir = -self.move_dir
+            self.avatar.move(self.move_dir)
+        GameScene.update(self)
+        if self.stage_frames >= configvalues.STRESS_STAGE_FRAMES:
+            self.end_stage()
+
+    def end_stage(self):
+        """
+        Decides whether the machine kept up with the current load level and either adds load or stops.
+        :return:
+        """
+        period = self.stage_period / self.stage_frames
+        work = self.stage_work / self.stage_frames
+        # frames are paced to the budget, so a machine that keeps up averages the budget (give or take timer jitter)
+        kept_up = period <= self.budget_ms * 1.05 and work <= self.budget_ms
+        print("stage {s:3d}: {e:4d} equations, {x:3d} explosions/s, {m:3d} moves/frame - frame {p:6.2f} ms "
+              "(work {w:6.2f} ms) {r}".format(s=self.stage, e=len(self.equations), x=2 * self.stage, m=self.stage,
+                                               p=period, w=work, r='ok' if kept_up else 'over budget'))
+        if not kept_up or self.stage >= configvalues.STRESS_MAX_STAGES:
+            if kept_up:
+                self.sustained = (self.stage, len(self.equations), work)
+                self.capped = True
+            self.switch_to_scene(None)
+            return
+        self.sustained = (self.stage, len(self.equations), work)
+        self.stage += 1
+        self.stage_frames = 0
+        self.stage_work = 0
+        self.stage_period = 0
+        # a stage never ends the level, so this is the only place full collections run during the stress test
+        gcpolicy.collect_at_transition()
+        self.measure = False
+        self.spawn_queue.resize(2 * (len(self.equations) + configvalues.STRESS_EQUATION_STEP))
+        for i in range(configvalues.STRESS_EQUATION_STEP):
+            eq = Equation(self.resources['eqfont'], self.resources['explosion_anim'], self.clock, self.spawn_queue,
+                          self.balance, self.lanes)
+            eq.reset(self.target.get_value(), self.window_w)
+            self.equations.append(eq)
+
+    def render(self, screen):
+        """
+        Draws the game, then the readout on top of it.
+        :param screen:
+        :return:
+        """
+        rects = GameScene.render(self, screen)
+        if isinstance(rects, list):
+            self.dirty_area = sum(r.width * r.height for r in rects)
+        visible = sum(1 for eq in self.equations if eq.delay <= 0)
+        text = self.resources['scorefont'].render(
+            "equations {e}  frame {f:.1f}/{b:.0f} ms  dirty {d} px".format(e=visible, f=self.work_ms, b=self.budget_ms,
+                                                                         d=self.dirty_area), True, (0, 255, 0))
+        rect = text.get_rect(topright=(self.window_w - 10, 10))
+        screen.blit(text, rect)
+        if isinstance(rects, list):
+            # the previous readout may have been wider
+            rects.append(rect.union(self.readout_rect) if self.readout_rect is not None else rect)
+        self.readout_rect = rect
+        # everything up to here is this frame's work; presenting it and waiting for the next frame are not
+        self.work_ms = (time.perf_counter() - self.frame_start) * 1000
+        return rects
+
+    def cleanup(self):
+        """
+        Prints the highest load level the machine kept up with.
+        :return:
+        """
+        GameScene.cleanup(self)
+        if self.sustained is None:
+            print("this machine can't keep up with the lowest load level at {f} FPS".format(f=configvalues.FPS))
+        elif self.capped:
+            stage, equations, work = self.sustained
+            print("max sustainable load at {f} FPS not found: still within budget at the last load level "
+                  "(STRESS_MAX_STAGES = {s}: {e} equations, {x} explosions/s, {m} avatar moves/frame, {w:.2f} ms of "
+                  "the {b:.0f} ms budget)".format(f=configvalues.FPS, s=stage, e=equations, x=2 * stage, m=stage,
+                                                   w=work, b=self.budget_ms))
+        else:
+            stage, equations, work = self.sustained
+            print("max sustainable load at {f} FPS: {e} equations, {x} explosions/s, {m} avatar moves/frame "
+                  "({w:.2f} ms of the {b:.0f} ms budget)".format(f=configvalues.FPS, e=equations, x=2 * stage, m=stage,
+                                                               w=work, b=self.budget_ms))
@@ -2,6 +2,7 @@ import os
 
 import pygame
 
+from scenes.animation import GameClock
 from scenes.common import Scene
 from config import configvalues
 from scenes.game import GameScene
@@ -10,18 +11,22 @@ from scenes.game import GameScene
 class TitleScene(Scene):
     """
     Title scene for the game. It simply displays the title and plays the theme music. After TITLE_TICKS frames, the
-    "press start" message will be displayed along the bottom of the screen as well.
+    "press start" message will be displayed along the bottom of the screen as well. Since nothing changes after that,
+    the scene is idle from then on.
     """
 
-    def __init__(self, resources):
+    def __init__(self, resources, progress=None):
         """
         Initialize the scene by starting the theme music.
         :param resources:
+        :param progress: optional ProgressStore games are recorded to
         """
         Scene.__init__(self, resources)
+        self.progress = progress
         pygame.mixer.music.load(os.path.join(configvalues.RESOURCE_DIR, 'theme.ogg'))
         pygame.mixer.music.set_volume(0.25)
         pygame.mixer.music.play(-1)
+        self.clock = GameClock()
         self.wait_tick = configvalues.TITLE_TICKS
 
     def get_name(self):
@@ -36,7 +41,9 @@ class TitleScene(Scene):
         """
         for event in events:
             if event.type == pygame.KEYDOWN or event.type == pygame.JOYBUTTONDOWN:
-                self.switch_to_scene(GameScene(self.resources))
+                # only build one GameScene even if several keys were pressed this frame
+                if self.next is self:
+                    self.switch_to_scene(GameScene(self.resources, progress=self.progress))
 
     def update(self):
         """
@@ -44,7 +51,14 @@ class TitleScene(Scene):
         displayed.
         :return:
         """
-        self.wait_tick -= 1
+        self.clock.update()
+        if self.wait_tick > 0:
+            self.wait_tick -= self.clock.scale
+            if self.wait_tick <= 0:
+                self.invalidate()
+
+    def is_idle(self):
+        return self.wait_tick <= 0
 
     def render(self, screen):
         """
@@ -55,7 +69,7 @@ class TitleScene(Scene):
         """
         screen.fill((255, 255, 255))
         screen.blit(self.resources['background'], (0, 0))
-        w, h = pygame.display.get_surface().get_size()
+        w, h = screen.get_size()
         self.render_centered(screen, w, h, self.resources['title'])
         if self.wait_tick <= 0:
             img_w, img_h = self.resources['anykey'].get_rect().size
@@ -0,0 +1,85 @@
+"""
+Measures how long the game takes to process and draw a frame with each render backend. A Bot plays the game scene for
+a fixed number of frames without any frame rate limit and the time spent in process_frame is reported. Game time
+advances one frame at FPS per frame measured (see sweep.SimClock), so the game plays as it would at FPS however fast
+the frames run.
+
+Usage: python -m tools.backend_bench --frames 2000 [--backend surface|texture|both] [--software-renderer]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import pygame
+
+import mathwizard
+from backend import create_backend
+from config import configvalues
+from scenes.game import GameScene
+from tools.bot import Bot, post_keys
+from tools.sweep import SimClock
+
+
+def measure(frames):
+    """
+    Plays the game scene for the given number of frames.
+    :param frames:
+    :return: list of frame times in milliseconds
+    """
+    assets = mathwizard.init()
+    backend = create_backend(configvalues.RENDER_BACKEND, (configvalues.WIDTH, configvalues.HEIGHT),
+                             configvalues.SOFTWARE_RENDERER)
+    backend.upload(assets)
+    scene = GameScene(assets, clock=SimClock())
+    bot = Bot()
+    times = []
+    for i in range(frames):
+        post_keys(bot.act(scene))
+        events = pygame.event.get()
+        start = time.perf_counter()
+        mathwizard.process_frame(scene, events, pygame.key.get_pressed(), backend)
+        times.append((time.perf_counter() - start) * 1000)
+        if scene.next is not scene:
+            break
+    scene.cleanup()
+    backend.close()
+    return times
+
+
+def summarize(name, times):
+    """
+    Formats the average and percentiles of the frame times.
+    :param name:
+    :param times:
+    :return:
+    """
+    ordered = sorted(times)
+    return "{n:8s} {c:6d} frames  avg {a:6.2f} ms  p50 {p50:6.2f} ms  p95 {p95:6.2f} ms  max {m:6.2f} ms".format(
+        n=name, c=len(times), a=sum(times) / len(times), p50=ordered[len(ordered) // 2],
+        p95=ordered[int(len(ordered) * .95)], m=ordered[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compares frame times of the render backends.')
+    parser.add_argument('--frames', type=int, default=2000, help='frames to measure')
+    parser.add_argument('--backend', choices=['surface', 'texture', 'both'], default='both')
+    parser.add_argument('--software-renderer', action='store_true',
+                        help="use SDL's software renderer with the texture backend")
+    args = parser.parse_args()
+    if args.backend == 'both':
+        # each backend initializes the display differently, so each one runs in its own process
+        for name in ('surface', 'texture'):
+            command = [sys.executable, '-m', 'tools.backend_bench', '--frames', str(args.frames), '--backend', name]
+            if args.software_renderer:
+                command.append('--software-renderer')
+            subprocess.run(command, check=True, cwd=os.getcwd())
+        return
+    configvalues.RENDER_BACKEND = args.backend
+    configvalues.SOFTWARE_RENDERER = args.software_renderer
+    print(summarize(args.backend, measure(args.frames)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import random
+
+import pygame
+
+
+class Bot:
+    """
+    Scripted player. On each frame it looks at the state of the active scene and decides which keys a human would press.
+    It picks the lowest equation on screen, walks the avatar under it and zaps it. With probability 1 - accuracy it
+    goes after an incorrect equation instead, and it ignores equations until they have been visible for reaction_ms
+    milliseconds of game time (so it reacts the same at any frame rate).
+    """
+
+    def __init__(self, accuracy=0.9, reaction_ms=200, rng=None):
+        """
+        :param accuracy: probability (0 - 1) that the bot goes after a correct equation
+        :param reaction_ms: milliseconds of game time an equation must be visible before the bot will react to it
+        :param rng: random.Random instance to use (so runs can be reproduced)
+        """
+        self.accuracy = accuracy
+        self.reaction_ms = reaction_ms
+        self.rng = rng if rng is not None else random.Random()
+        self.chosen = None
+        self.chosen_payload = None
+        self.first_seen = {}
+
+    def act(self, scene):
+        """
+        Decides which keys to press on this frame.
+        :param scene: the active scene
+        :return: list of key codes
+        """
+        name = scene.get_name()
+        if name == 'title':
+            return [pygame.K_SPACE]
+        if name != 'game':
+            return []
+        if scene.paused:
+            return [pygame.K_p]
+        if scene.won_level:
+            self.chosen = None
+            self.chosen_payload = None
+            if scene.display_win and scene.wait_tick <= 0:
+                return [pygame.K_SPACE]
+            return []
+        return self.play(scene.avatar, scene.equations, scene.balance.zap_width)
+
+    def play(self, avatar, equations, zap_width):
+        """
+        Picks a target equation (if needed) and returns the key that moves the avatar toward it or zaps it.
+        :param avatar:
+        :param equations:
+        :param zap_width: number of positions on either side of the avatar a zap reaches
+        :return: list of key codes
+        """
+        visible = self.track_visible(equations, avatar.clock.time)
+        if not self.is_live(self.chosen):
+            self.chosen = self.choose(visible)
+            self.chosen_payload = self.chosen.payload if self.chosen is not None else None
+        if self.chosen is None:
+            return []
+        diff = self.chosen.get_pos_idx() - avatar.get_pos_idx()
+        if abs(diff) <= zap_width // 2:
+            if avatar.jumping:
+                return []
+            self.chosen = None
+            return [pygame.K_UP]
+        if diff > 0:
+            return [pygame.K_RIGHT]
+        return [pygame.K_LEFT]
+
+    def track_visible(self, equations, now):
+        """
+        Records the time each equation first became visible and returns the ones the bot has had time to react to.
+        Equations are reused, so they are tracked by the payload they were last reset with.
+        :param equations:
+        :param now: current game time in milliseconds
+        :return:
+        """
+        ready = []
+        first_seen = {}
+        for eq in equations:
+            if eq.delay > 0 or eq.exploding:
+                continue
+            seen_payload, seen_at = self.first_seen.get(eq, (None, 0))
+            if seen_payload is not eq.payload:
+                seen_at = now
+            first_seen[eq] = (eq.payload, seen_at)
+            if now - seen_at >= self.reaction_ms:
+                ready.append(eq)
+        # only keep the equations on screen now so equations from old scenes can be freed
+        self.first_seen = first_seen
+        return ready
+
+    def choose(self, visible):
+        """
+        Picks the equation closest to the floor, going after a correct one with probability accuracy.
+        :param visible:
+        :return: Equation or None
+        """
+        want_correct = self.rng.random() < self.accuracy
+        candidates = [eq for eq in visible if eq.is_correct() == want_correct]
+        if len(candidates) == 0:
+            return None
+        return max(candidates, key=lambda eq: eq.get_pos()[1])
+
+    def is_live(self, eq):
+        """
+        Returns True if the equation is still on screen and still showing the equation the bot chose.
+        :param eq:
+        :return:
+        """
+        return eq is not None and eq.payload is self.chosen_payload and not eq.exploding and eq.delay <= 0
+
+
+def post_keys(keys):
+    """
+    Posts a KEYDOWN/KEYUP pair for each key so it goes through the same event handling as a real key press.
+    :param keys:
+    :return:
+    """
+    for key in keys:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=''))
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, mod=0, unicode=''))
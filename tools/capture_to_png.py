@@ -0,0 +1,52 @@
+"""
+Turns a file recorded with `mathwizard.py --capture` into a sequence of PNG images.
+
+Usage: python -m tools.capture_to_png session.cap out_dir
+"""
+import argparse
+import os
+
+import pygame
+
+from capture import read_capture
+
+
+def convert(file_name, out_dir, every=1):
+    """
+    Replays the delta frames onto a canvas and saves the canvas after each frame.
+    :param file_name: capture file
+    :param out_dir: directory for the images
+    :param every: only save every nth frame
+    :return: number of images written
+    """
+    frames = read_capture(file_name)
+    width, height, bitsize, bytesize, r_mask, g_mask, b_mask, a_mask = next(frames)
+    canvas = pygame.Surface((width, height), 0, bitsize, (r_mask, g_mask, b_mask, a_mask))
+    pitch = canvas.get_pitch()
+    os.makedirs(out_dir, exist_ok=True)
+    written = 0
+    for frame, ticks, regions in frames:
+        raw = canvas.get_buffer()
+        for x, y, w, h, pixels in regions:
+            row_len = w * bytesize
+            for row in range(h):
+                raw.write(pixels[row * row_len:(row + 1) * row_len], (y + row) * pitch + x * bytesize)
+        del raw
+        if frame % every == 0:
+            pygame.image.save(canvas, os.path.join(out_dir, "frame{f:06d}.png".format(f=frame)))
+            written += 1
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Converts a Math Wizard capture file into PNG images.')
+    parser.add_argument('capture', help='capture file to read')
+    parser.add_argument('out_dir', help='directory to write the images to')
+    parser.add_argument('--every', type=int, default=1, help='only write every nth frame')
+    args = parser.parse_args()
+    count = convert(args.capture, args.out_dir, args.every)
+    print("wrote {n} images to {d}".format(n=count, d=args.out_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Prints a student's accuracy on each fact (equation), weakest first, from the progress database.
+
+Usage: python -m tools.progress_report STUDENT [--db progress.db] [--days 30] [--min-attempts 3]
+"""
+import argparse
+import time
+
+from config import configvalues
+from progress import fact_accuracy, open_db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports a student's accuracy per fact.")
+    parser.add_argument('student')
+    parser.add_argument('--db', default=configvalues.PROGRESS_DB, help='progress database')
+    parser.add_argument('--days', type=float, help='only include the last DAYS days (default: all history)')
+    parser.add_argument('--min-attempts', type=int, default=1, help='leave out facts answered fewer times')
+    args = parser.parse_args()
+
+    since = time.time() - args.days * 86400 if args.days is not None else None
+    conn = open_db(args.db)
+    rows = fact_accuracy(conn, args.student, since, args.min_attempts)
+    conn.close()
+    if len(rows) == 0:
+        print("no results for {s}".format(s=args.student))
+        return
+    print("{f:>10s}  {a:>8s}  {c:>8s}  {p:>8s}".format(f='fact', a='attempts', c='correct', p='accuracy'))
+    for fact, attempts, correct, accuracy in rows:
+        print("{f:>10s}  {a:8d}  {c:8d}  {p:8.1%}".format(f=fact, a=attempts, c=correct, p=accuracy))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Long running soak test. A Bot plays the game through title -> game -> escape -> title cycles under the dummy SDL drivers
+and memory usage is recorded after every cycle so leaks show up as growth across cycles.
+
+Usage: python -m tools.soak --hours 8
+"""
+import argparse
+import gc
+import os
+import resource
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import mathwizard
+from scenes.title import TitleScene
+from tools.bot import Bot, post_keys
+
+
+def rss_bytes():
+    """
+    Returns the resident set size of this process. Falls back to the peak RSS where /proc isn't available.
+    :return:
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def count_objects():
+    """
+    Counts the objects tracked by the garbage collector, including the ones frozen after loading.
+    :return:
+    """
+    return len(gc.get_objects()) + gc.get_freeze_count()
+
+
+def count_surfaces():
+    """
+    Counts the distinct Surface objects referenced from objects tracked by the garbage collector. Frozen objects can't
+    be listed, so surfaces only referenced by assets loaded before the freeze aren't counted.
+    :return:
+    """
+    seen = set()
+    for obj in gc.get_objects():
+        for ref in gc.get_referents(obj):
+            if isinstance(ref, pygame.Surface):
+                seen.add(id(ref))
+    return len(seen)
+
+
+class Soak:
+    """
+    Frame hook for run_game that drives the bot through cycles and takes a memory sample each time the game returns to
+    the title screen.
+    """
+
+    def __init__(self, bot, duration, cycle_time, title_time, warmup, tolerance, window=3):
+        """
+        :param bot: Bot instance that plays the game
+        :param duration: number of seconds to run
+        :param cycle_time: number of seconds to play before pressing escape
+        :param title_time: number of seconds to wait on the title screen before starting the next game
+        :param warmup: number of cycles to run before taking the baseline sample
+        :param tolerance: fraction a metric may grow over the baseline before it is flagged
+        :param window: number of final cycles that must all be over the tolerance for growth to be flagged
+        """
+        self.bot = bot
+        self.end_time = time.time() + duration
+        self.cycle_time = cycle_time
+        self.title_time = title_time
+        self.warmup = warmup
+        self.tolerance = tolerance
+        self.window = window
+        self.scene_start = 0
+        self.last_scene = None
+        self.samples = []
+
+    def __call__(self, scene):
+        if scene is not self.last_scene:
+            if self.last_scene is not None and scene.get_name() == 'title':
+                self.record()
+            self.last_scene = scene
+            self.scene_start = time.time()
+        # the limits are in seconds rather than frames since the frame rate adapts to the machine
+        scene_time = time.time() - self.scene_start
+        if scene.get_name() == 'title':
+            if time.time() >= self.end_time:
+                pygame.event.post(pygame.event.Event(pygame.QUIT))
+            elif scene_time >= self.title_time:
+                post_keys([pygame.K_SPACE])
+        elif scene_time >= self.cycle_time:
+            post_keys([pygame.K_ESCAPE])
+        else:
+            post_keys(self.bot.act(scene))
+
+    def record(self):
+        """
+        Collects garbage then samples RSS, object count and surface count.
+        :return:
+        """
+        # drop the previous scene before sampling so it isn't counted
+        self.last_scene = None
+        gc.collect()
+        sample = (rss_bytes(), count_objects(), count_surfaces())
+        self.samples.append(sample)
+        print("cycle {c:5d}  rss {r:8.1f} MB  objects {o:8d}  surfaces {s:5d}".format(
+            c=len(self.samples), r=sample[0] / 1048576, o=sample[1], s=sample[2]))
+        sys.stdout.flush()
+
+    def report(self):
+        """
+        Compares the last window samples with the baseline taken after the warmup cycles and prints any metric that
+        stayed more than the tolerance above it. Requiring the whole window keeps one-off spikes from being flagged.
+        :return: True if growth was flagged
+        """
+        if len(self.samples) < self.warmup + self.window:
+            print("not enough cycles to compare against the baseline ({n} recorded)".format(n=len(self.samples)))
+            return False
+        baseline = self.samples[self.warmup]
+        last = [min(values) for values in zip(*self.samples[-self.window:])]
+        flagged = False
+        for name, base, value in zip(('rss', 'objects', 'surfaces'), baseline, last):
+            growth = (value - base) / base if base else 0
+            if growth > self.tolerance:
+                flagged = True
+                print("GROWTH {n}: {b} -> {v} ({g:+.1%})".format(n=name, b=base, v=value, g=growth))
+        if not flagged:
+            print("no growth over {t:.0%} across {n} cycles".format(t=self.tolerance, n=len(self.samples)))
+        return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a bot through title/game cycles and reports memory growth.')
+    parser.add_argument('--hours', type=float, default=1.0, help='how long to run')
+    parser.add_argument('--cycle-seconds', type=float, default=60, help='time played per game before escaping')
+    parser.add_argument('--title-seconds', type=float, default=2, help='time spent on the title screen per cycle')
+    parser.add_argument('--accuracy', type=float, default=0.9, help='chance the bot goes after a correct equation')
+    parser.add_argument('--reaction', type=float, default=0.3, help='bot reaction delay in seconds')
+    parser.add_argument('--warmup', type=int, default=2, help='cycles to run before taking the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed growth over the baseline')
+    args = parser.parse_args()
+
+    bot = Bot(args.accuracy, int(args.reaction * 1000))
+    soak = Soak(bot, args.hours * 3600, args.cycle_seconds, args.title_seconds, args.warmup, args.tolerance)
+    assets = mathwizard.init()
+    mathwizard.run_game(assets, TitleScene(assets), soak)
+    sys.exit(1 if soak.report() else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""
+Balance sweep. Plays every combination of the balance settings given on the command line with a scripted player and
+reports how long levels take, how accurate the player's zaps are and how many correct equations reach the floor
+without being zapped. Rounds are simulated without a display (the real Equation and Avatar classes are stepped frame
+by frame with game time advancing 1/FPS each frame), so they run much faster than real time and are spread over a
+pool of processes. Equations are placed by the game's LaneScheduler, with their text rendered in the game's font
+(pygame.font doesn't need a display) so the scheduler reserves the same widths it does in the game.
+
+Usage: python -m tools.sweep --max-step 2,3,4 --max-delay 50,100 --zap-width 2,4 --seeds 8 [--csv results.csv]
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+from config import configvalues
+from config.balance import Balance
+from scenes.animation import Animation
+from scenes.game import Avatar, Equation, find_collision
+from scenes.lanes import LaneScheduler
+from tools.bot import Bot
+
+# columns of the results table
+COLUMNS = ['max_step', 'max_delay', 'incorrect_answer_ratio', 'zap_width', 'max_concurrent', 'score_per_level',
+           'levels', 'timeouts', 'level_secs', 'accuracy', 'missed_per_level']
+
+
+class SimClock:
+    """
+    Stands in for GameClock. Game time advances by exactly one frame per step instead of following the wall clock.
+    """
+
+    def __init__(self):
+        self.time = 0
+        self.scale = 1
+
+    def step(self):
+        self.time += 1000 // configvalues.FPS
+
+    def update(self, running=True):
+        """
+        Same as GameClock.update, but every call is one frame at FPS.
+        :param running:
+        :return:
+        """
+        if running:
+            self.step()
+
+    def resume(self):
+        pass
+
+
+def simulate(job):
+    """
+    Plays a number of levels with one balance setting.
+    :param job: tuple of (Balance, seed, levels, accuracy, reaction_ms, max_frames, top_of_floor)
+    :return: tuple of (Balance, completed levels, timed out levels, frames played, correct zaps, wrong zaps,
+             missed correct equations)
+    """
+    balance, seed, levels, accuracy, reaction_ms, max_frames, top_of_floor = job
+    # equations are generated with the random module so seeding it makes each run reproducible
+    random.seed(seed)
+    bot = Bot(accuracy, reaction_ms, random.Random(seed))
+    clock = SimClock()
+    # animations without frames - only their timing matters here
+    explosion = Animation([None] * 4, configvalues.ANIMATION_FRAME_MS)
+    walk = Animation([None] * 4, configvalues.ANIMATION_FRAME_MS, loop=True)
+    jump = Animation([None] * 4, configvalues.ANIMATION_FRAME_MS)
+    avatar = Avatar({'walk_r': walk, 'walk_l': walk, 'jump_r': jump, 'jump_l': jump}, clock)
+    # same font as the game's eqfont (see mathwizard.load_resources), so lanes are reserved for the real text widths
+    pygame.font.init()
+    font = pygame.font.SysFont("monospace", 25, True)
+    lanes = LaneScheduler(configvalues.WIDTH, top_of_floor, balance)
+    equations = [Equation(font, explosion, clock, None, balance, lanes) for i in range(balance.max_concurrent)]
+    targets = list(range(0, configvalues.MAX_TARGET + 1))
+    random.shuffle(targets)
+
+    completed = timeouts = frames = correct = wrong = missed = 0
+    for level in range(levels):
+        target = targets[level % len(targets)]
+        for eq in equations:
+            eq.reset(target, configvalues.WIDTH)
+        level_score = 0
+        level_frames = 0
+        while level_score < balance.score_per_level and level_frames < max_frames:
+            # same rules as GameScene.process_input/handle_jump
+            for key in bot.play(avatar, equations, balance.zap_width):
+                if key == pygame.K_LEFT:
+                    avatar.move(-1)
+                elif key == pygame.K_RIGHT:
+                    avatar.move(1)
+                elif key == pygame.K_UP:
+                    avatar.jump()
+                    hit = find_collision(equations, avatar.get_pos_idx(), balance.zap_width)
+                    if hit is not None:
+                        if hit.is_correct():
+                            correct += 1
+                            level_score += 1
+                        else:
+                            wrong += 1
+                        hit.explode()
+            clock.step()
+            level_frames += 1
+            lanes.tick()
+            avatar.update()
+            for eq in equations:
+                if eq.update(top_of_floor):
+                    # an equation that wasn't exploding made it to the floor
+                    if not eq.exploding and eq.is_correct():
+                        missed += 1
+                    eq.reset(target, configvalues.WIDTH)
+        frames += level_frames
+        if level_score >= balance.score_per_level:
+            completed += 1
+        else:
+            timeouts += 1
+    return balance, completed, timeouts, frames, correct, wrong, missed
+
+
+def build_grid(args):
+    """
+    Builds every combination of the balance values given on the command line.
+    :param args:
+    :return: list of Balance
+    """
+    values = [parse_list(getattr(args, field)) if getattr(args, field) else [default]
+              for field, default in zip(Balance._fields, Balance())]
+    return [Balance(*combo) for combo in itertools.product(*values)]
+
+
+def parse_list(text):
+    return [int(v) for v in text.split(',')]
+
+
+def aggregate(results):
+    """
+    Combines the runs of each balance setting into one row of the results table.
+    :param results: iterable of simulate return values
+    :return: list of rows, in the order the settings were first seen
+    """
+    totals = {}
+    for balance, *counts in results:
+        current = totals.setdefault(balance, [0] * len(counts))
+        for i, count in enumerate(counts):
+            current[i] += count
+    rows = []
+    for balance, (completed, timeouts, frames, correct, wrong, missed) in totals.items():
+        levels = completed + timeouts
+        zaps = correct + wrong
+        rows.append(list(balance) + [
+            completed, timeouts,
+            round(frames / configvalues.FPS / levels, 2) if levels else 0,
+            round(correct / zaps, 3) if zaps else 0,
+            round(missed / levels, 2) if levels else 0])
+    return rows
+
+
+def print_table(rows):
+    widths = [max(len(c), 6) for c in COLUMNS]
+    print('  '.join(c.rjust(w) for c, w in zip(COLUMNS, widths)))
+    for row in rows:
+        print('  '.join(str(v).rjust(w) for v, w in zip(row, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulates rounds over a grid of balance settings.')
+    for field in Balance._fields:
+        parser.add_argument('--' + field.replace('_', '-'), dest=field,
+                            help='comma separated values (default {d})'.format(d=getattr(Balance(), field)))
+    parser.add_argument('--seeds', type=int, default=4, help='runs per setting')
+    parser.add_argument('--levels', type=int, default=5, help='levels per run')
+    parser.add_argument('--accuracy', type=float, default=0.9, help='chance the player goes after a correct equation')
+    parser.add_argument('--reaction', type=float, default=0.3, help='player reaction delay in seconds')
+    parser.add_argument('--timeout', type=float, default=120, help='seconds before a level is abandoned')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of processes')
+    parser.add_argument('--csv', help='also write the results to this file')
+    args = parser.parse_args()
+
+    # equations reset once they reach the top of the floor tiles
+    floor_tile = pygame.image.load(os.path.join(configvalues.RESOURCE_DIR, 'stone.jpg'))
+    top_of_floor = configvalues.HEIGHT - floor_tile.get_height()
+    jobs = [(balance, seed, args.levels, args.accuracy, int(args.reaction * 1000),
+             int(args.timeout * configvalues.FPS), top_of_floor)
+            for balance in build_grid(args) for seed in range(args.seeds)]
+    with ProcessPoolExecutor(args.workers) as pool:
+        rows = aggregate(pool.map(simulate, jobs, chunksize=max(1, len(jobs) // (args.workers * 4))))
+    print_table(rows)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()